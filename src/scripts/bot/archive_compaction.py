@@ -0,0 +1,191 @@
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from log_setup import setup_logging
+from relative_time import parse_time
+from snapshot_io import read_snapshot
+from stream_parser import item_key
+
+
+logger = logging.getLogger(__name__)
+
+SOURCE_DIR = "fetch-data"
+ARCHIVE_DIR = os.path.join(SOURCE_DIR, ".archive")
+
+SNAPSHOT_NAME_RE = re.compile(r'^(?P<domain>.+)-(?P<date>\d{4}-\d{2}-\d{2})-(?P<hour>\d{2})\.txt(?:\.gz|\.zst)?$')
+
+COLUMNS = ['domain', 'fetched_at', 'published_at', 'title', 'link', 'content']
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError("pyarrow is required for archive compaction (pip install pyarrow)")
+
+
+def _schema():
+    return pa.schema([
+        ('domain', pa.string()),
+        ('fetched_at', pa.int64()),
+        ('published_at', pa.int64()),
+        ('title', pa.string()),
+        ('link', pa.string()),
+        ('content', pa.string()),
+    ])
+
+
+def iter_snapshots(source_dir=SOURCE_DIR, domain=None):
+    """Yield (domain, fetched_at, path) for every hourly snapshot, oldest first"""
+    domains = [domain] if domain else sorted(
+        name for name in os.listdir(source_dir)
+        if not name.startswith('.') and os.path.isdir(os.path.join(source_dir, name))
+    )
+    for domain_name in domains:
+        domain_path = os.path.join(source_dir, domain_name)
+        for root, _, files in sorted(os.walk(domain_path)):
+            for file_name in sorted(files):
+                match = SNAPSHOT_NAME_RE.match(file_name)
+                if not match:
+                    continue
+                fetched_at = datetime.strptime(f"{match['date']} {match['hour']}", "%Y-%m-%d %H").timestamp()
+                yield domain_name, int(fetched_at), os.path.join(root, file_name)
+
+
+def _period_key(fetched_at, period):
+    return datetime.fromtimestamp(fetched_at).strftime("%Y-%m-%d" if period == 'day' else "%Y-%m")
+
+
+def compact(source_dir=SOURCE_DIR, archive_dir=ARCHIVE_DIR, domain=None, period='month', dedupe=True):
+    """
+    Roll hourly snapshots into one Parquet file per domain and period, sorted by published_at:
+    <archive_dir>/<day|month>/<domain>/<period key>.parquet
+    Rewrites each period file completely, so it is safe to re-run. Returns the written paths.
+    """
+    _require_pyarrow()
+    if period not in ('day', 'month'):
+        raise ValueError(f"Unknown period: {period} (expected 'day' or 'month')")
+
+    groups = {}
+    for domain_name, fetched_at, path in iter_snapshots(source_dir, domain):
+        groups.setdefault((domain_name, _period_key(fetched_at, period)), []).append((fetched_at, path))
+
+    written = []
+    for (domain_name, period_key), snapshots in sorted(groups.items()):
+        rows = {column: [] for column in COLUMNS}
+        seen = set()
+        for fetched_at, path in snapshots:
+            try:
+                records = read_snapshot(path)
+            except (OSError, ValueError, RuntimeError) as e:
+                logger.warning(f"[COMPACT] Skipping unreadable snapshot {path}: {e}")
+                continue
+
+            for record in records:
+                if dedupe:
+                    key = item_key(record)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                published_at = record.get('timestamp') or parse_time(record.get('time', ''), fetched_at)
+                rows['domain'].append(domain_name)
+                rows['fetched_at'].append(fetched_at)
+                rows['published_at'].append(published_at)
+                rows['title'].append(record.get('title', ''))
+                rows['link'].append(record.get('link', ''))
+                rows['content'].append(record.get('content', ''))
+
+        table = pa.table(rows, schema=_schema()).sort_by([('published_at', 'ascending')])
+        folder_path = os.path.join(archive_dir, period, domain_name)
+        os.makedirs(folder_path, exist_ok=True)
+        file_path = os.path.join(folder_path, f"{period_key}.parquet")
+        tmp_path = f"{file_path}.tmp"
+        pq.write_table(table, tmp_path, compression='zstd', row_group_size=10000)
+        os.replace(tmp_path, file_path)
+        logger.info(f"[COMPACT] {domain_name} {period_key}: {table.num_rows} rows from {len(snapshots)} snapshots -> {file_path}")
+        written.append(file_path)
+
+    return written
+
+
+def read_items(domain=None, start=None, end=None, columns=None, period='month', archive_dir=ARCHIVE_DIR):
+    """
+    Load archived items as a pyarrow Table.
+    start/end are epoch seconds on published_at (inclusive/exclusive); only the requested
+    columns are read and row groups outside the range are skipped.
+    """
+    _require_pyarrow()
+    folder_path = os.path.join(archive_dir, period, domain) if domain else os.path.join(archive_dir, period)
+    if not os.path.isdir(folder_path):
+        return _schema().empty_table().select(columns or COLUMNS)  # typed, so compute kernels still apply
+
+    dataset = ds.dataset(folder_path, format='parquet', schema=_schema())
+    condition = None
+    if start is not None:
+        condition = ds.field('published_at') >= start
+    if end is not None:
+        upper = ds.field('published_at') < end
+        condition = upper if condition is None else condition & upper
+    return dataset.to_table(columns=columns, filter=condition)
+
+
+def search(keyword, domain=None, start=None, end=None, column='content', period='month', archive_dir=ARCHIVE_DIR):
+    """Case-insensitive substring search over one text column within a time range"""
+    columns = ['published_at', 'title', 'link']
+    if column not in columns:
+        columns.append(column)
+    table = read_items(domain, start, end, columns=columns, period=period, archive_dir=archive_dir)
+    mask = pc.match_substring(table[column], keyword, ignore_case=True)
+    return table.filter(mask)
+
+
+def _to_epoch(date_text):
+    return int(datetime.strptime(date_text, "%Y-%m-%d").timestamp()) if date_text else None
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Compact fetch-data snapshots into Parquet and query them")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    compact_parser = subparsers.add_parser('compact', help="Roll hourly snapshots into per-day or per-month files")
+    compact_parser.add_argument('--domain')
+    compact_parser.add_argument('--period', default='month', choices=['day', 'month'])
+    compact_parser.add_argument('--keep-duplicates', action='store_true', help="Keep repeated items from overlapping snapshots")
+    compact_parser.add_argument('--source', default=SOURCE_DIR)
+    compact_parser.add_argument('--archive', default=ARCHIVE_DIR)
+
+    search_parser = subparsers.add_parser('search', help="Find archived items containing a keyword")
+    search_parser.add_argument('keyword')
+    search_parser.add_argument('--domain')
+    search_parser.add_argument('--since', help="YYYY-MM-DD")
+    search_parser.add_argument('--until', help="YYYY-MM-DD (exclusive)")
+    search_parser.add_argument('--column', default='content', choices=['content', 'title', 'link'])
+    search_parser.add_argument('--period', default='month', choices=['day', 'month'], help="Which compacted files to read")
+    search_parser.add_argument('--archive', default=ARCHIVE_DIR)
+
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    if args.command == 'compact':
+        compact(args.source, args.archive, args.domain, args.period, dedupe=not args.keep_duplicates)
+        return
+
+    table = search(args.keyword, args.domain, _to_epoch(args.since), _to_epoch(args.until), args.column, args.period, args.archive)
+    for row in table.to_pylist():
+        published = datetime.fromtimestamp(row['published_at']).strftime('%Y-%m-%d %H:%M') if row['published_at'] else '?'
+        print(json.dumps({"published": published, "title": row['title'], "link": row['link']}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
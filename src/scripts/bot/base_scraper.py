@@ -0,0 +1,417 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from selenium.webdriver.common.by import By
+
+from browser_profile import apply_blocking, wait_until_ready
+from driver_pool import DriverLifecycle
+from fetch_policy import FetchPolicy, VerificationPageError, wait_out_verification
+from http_fetcher import VERIFICATION_REASON, HttpStreamFetcher
+from item_store import ItemStore
+from log_setup import RunSummary
+from news_index import NewsIndex
+from pipeline import HighWaterSink, IndexSink, NdjsonSink, SnapshotSink, peek, run_pipeline
+from relative_time import iter_normalized
+from run_metrics import export_run
+from scrape_state import HighWaterMark, PageFingerprint, domain_from_url
+from scroll_loader import scroll_stream, stream_fingerprint
+from site_adapters import SelectorPlan
+from stream_parser import ExtractionError, StreamPage, is_too_old, item_key, iter_stream, parse_items
+
+
+logger = logging.getLogger(__name__)
+
+
+class BaseScraper:
+    """
+    Fetch, extraction and storage shared by the background and single-URL scrapers.
+    Subclasses provide setup_driver() and may override the hooks below.
+    """
+
+    OK = "✓"  # success marker in log messages
+    SCROLL_PAUSE = None  # (min, max) seconds to pause before each scroll, or None
+
+    def __init__(self, url, engine='auto', extraction='single-pass', incremental=True, parser_backend='lxml', storage='snapshot', index=True, compression='none', metrics=True, lifecycle=None, policy=None, sinks=()):
+        logger.info(f"Initializing scraper for URL: {url}")
+        self.url = url
+        self.MAX_DAY = 2
+        self.MAX_HOUR = 48
+        self.engine = engine  # 'auto' (HTTP first, Selenium fallback), 'http' or 'selenium'
+        self.extraction = extraction  # 'single-pass' (page_source) or 'legacy' (per-item WebDriver lookups)
+        self.incremental = incremental  # stop at items already saved by a previous run
+        self.parser_backend = parser_backend  # see stream_parser.PARSER_BACKENDS
+        self.storage = storage  # 'snapshot' (hourly .txt), 'ndjson' (deduplicated item store) or 'both'
+        self.compression = compression  # snapshot compression: 'none' keeps the plain .txt files the TS side reads
+        self.item_store = None
+        self.index = index  # keep the full-text search index up to date after each save
+        self.news_index = None
+        self.high_water = None
+        self.fingerprint = None
+        self.selectors = None  # site_adapters.SelectorPlan for the current fetch
+        self.fetched_at = None
+        self.metrics = metrics  # export per-run timings to fetch-data/.metrics
+        self.sinks = list(sinks)  # extra pipeline sinks fed every saved item, e.g. pipeline.QueueSink
+        self.summary = RunSummary(logger, 'FETCH', url=url)
+        self.driver = None
+        self.lifecycle = lifecycle or DriverLifecycle()  # when to recycle our own browser session
+        self.policy = policy or FetchPolicy()  # retries with backoff, per-domain circuit breaker
+        self.breaker = None
+        self.http_fetcher = HttpStreamFetcher(max_hour=self.MAX_HOUR, max_day=self.MAX_DAY)
+
+    def setup_driver(self):
+        raise NotImplementedError
+
+    def fetch_data(self):
+        """Main fetch operation; returns whether the run succeeded"""
+        try:
+            logger.info(f"Starting fetch operation at {datetime.now()}")
+            self.summary = RunSummary(logger, 'FETCH', url=self.url, status='failed')
+
+            self.fetched_at = time.time()
+            self.high_water = HighWaterMark(domain_from_url(self.url)) if self.incremental else None
+            self.fingerprint = PageFingerprint(domain_from_url(self.url)) if self.incremental else None
+            self.selectors = SelectorPlan(domain_from_url(self.url))
+            self.breaker = self.policy.breaker(domain_from_url(self.url))
+            if self.policy.use_breaker and not self.breaker.allow():
+                logger.warning(f"[FETCH] Circuit open for {self.breaker.domain} ({self.breaker.reason}), "
+                               f"skipping for another {self.breaker.remaining() / 60:.0f} min")
+                self.summary.set(status='circuit-open')
+                return False
+
+            records = None
+            if self.engine != 'selenium':
+                self.summary.set(engine='http')
+                with self.summary.phase('http'):
+                    records = self.fetch_via_http()
+
+            if records is None:
+                if self.engine == 'http':
+                    logger.error("[ERROR] HTTP fetch failed and Selenium fallback is disabled")
+                    self.summary.error('http')
+                    return False
+
+                self.summary.set(engine='selenium')
+                # Extraction is lazy, so the session is held until the records are stored
+                with self.browser_session():
+                    return self.store_records(self.load_and_extract())
+            return self.store_records(records)
+
+        except VerificationPageError as e:
+            logger.error(f"[ERROR] Blocked by a verification page: {e}")
+            self.summary.set(status='verification')
+            self.summary.error('fetch')
+            return False
+        except Exception as e:
+            logger.error(f"[ERROR] Fetch operation failed: {e}")
+            self.summary.error('fetch')
+            return False
+        finally:
+            self.record_outcome()
+            self.summary.emit()
+            if self.metrics:
+                export_run(self.summary, 'scraper', domain_from_url(self.url))
+
+    def fetch_via_http(self):
+        """Fetch the stream over plain HTTP, returning None when Selenium is needed"""
+        logger.info(f"[HTTP] Fetching {self.url} without browser...")
+        validators = dict(etag=self.fingerprint.etag, last_modified=self.fingerprint.last_modified) if self.fingerprint else {}
+        result = self.policy.call(
+            lambda: self.http_fetcher.fetch(
+                self.url, seen_keys=self.seen_keys(), container_selectors=self.selector_plan().container_xpaths(), **validators
+            ),
+            label='HTTP request', retry_if=lambda result: result.transient and result.fallback_reason
+        )
+        if result.not_modified:
+            logger.info(f"[HTTP] {self.OK} Page not modified since last run")
+            self.summary.set(shortcut='not-modified')
+            return []
+        if result.fallback_reason == VERIFICATION_REASON and self.engine == 'http':
+            raise VerificationPageError(result.fallback_reason)
+        if result.needs_fallback:
+            logger.info(f"[HTTP] Falling back to Selenium: {result.fallback_reason}")
+            return None
+        if self.fingerprint:
+            self.fingerprint.observe(etag=result.etag, last_modified=result.last_modified)
+        logger.info(f"[HTTP] {self.OK} Extracted {len(result.records)} items from server-rendered HTML")
+        return result.records
+
+    def seen_keys(self):
+        return self.high_water.seen_keys if self.high_water else None
+
+    def selector_plan(self):
+        """This run's selector plan; outside fetch_data (e.g. benchmarks) one that is not persisted"""
+        return self.selectors or SelectorPlan(domain_from_url(self.url), persist=False)
+
+    def stream_unchanged(self):
+        """Compare the top of the loaded stream with the last run's, before any scrolling or parsing"""
+        if not self.fingerprint:
+            return False
+        digest = stream_fingerprint(self.driver, self.selector_plan().adapter)
+        if digest and digest == self.fingerprint.digest:
+            logger.info(f"[FETCH] {self.OK} Top of the stream unchanged since last run, skipping scroll and extraction")
+            self.summary.set(shortcut='fingerprint')
+            return True
+        self.fingerprint.observe(digest=digest)
+        return False
+
+    def record_outcome(self):
+        """Report this run to the domain's circuit breaker (a failed save is not the site's fault)"""
+        status = self.summary.fields.get('status')
+        if not self.breaker or status in ('circuit-open', 'save-failed'):
+            return
+        if status in ('ok', 'unchanged'):
+            self.breaker.record_success()
+        else:
+            verification = status == 'verification'
+            self.breaker.record_failure('verification page' if verification else 'fetch failed', verification=verification)
+
+    def store_records(self, records):
+        """Stream records from extraction through normalization into the sinks; returns whether they were saved"""
+        try:
+            records, empty = peek(records)
+        except ExtractionError as e:
+            logger.error(f"[ERROR] No data extracted: {e}")
+            return False
+
+        if empty:
+            self.summary.set(status='unchanged')
+            self.summary.count('items', 0)
+            if self.fingerprint:
+                self.fingerprint.commit()
+            logger.info(f"[FETCH] {self.OK} No new items since last run")
+            return True
+
+        logger.info("[FETCH] Saving data as it is extracted...")
+        result = self.save_records(iter_normalized(records, fetched_at=self.fetched_at))
+        self.summary.count('items', result.count)
+        self.summary.set(status='ok' if result.saved else 'save-failed')
+        if not result.saved:
+            self.summary.error('save')
+            return False
+        logger.info(f"[FETCH] {self.OK} Fetch operation completed successfully ({result.count} items)")
+        return True
+
+    @contextmanager
+    def browser_session(self):
+        """Hold this scraper's own Chrome session for one fetch, replacing it when it is worn out"""
+        with self.summary.phase('setup'):
+            self.check_driver()
+            if not self.driver:
+                self.setup_driver()
+        self.lifecycle.used(self.driver)
+        yield self.driver
+
+    def check_driver(self):
+        """Liveness probe before a fetch: replace a crashed, worn-out or oversized session"""
+        if not self.driver:
+            return
+        reason = self.lifecycle.retire_reason(self.driver)
+        if reason:
+            logger.info(f"[SETUP] Recycling browser session ({reason})")
+            self.close_driver()
+
+    def close_driver(self):
+        driver, self.driver = self.driver, None
+        self.lifecycle.forget(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.error(f"[ERROR] Failed to quit browser: {e}")
+
+    def load_and_extract(self):
+        """Load, scroll and extract records with the current driver"""
+        logger.info(f"[FETCH] Loading URL: {self.url}")
+        with self.summary.phase('load'):
+            apply_blocking(self.driver, self.browser_profile)  # the session may have served another domain
+            self.policy.call(self.load_page, label='Page load')
+
+        if self.stream_unchanged():
+            return []
+
+        logger.info("[FETCH] Scrolling page to load dynamic content...")
+        with self.summary.phase('scroll'):
+            self.scroll_to_bottom()
+
+        logger.info("[FETCH] Extracting content...")
+        # Lazy: items are extracted as the sinks consume them
+        if self.extraction == 'single-pass':
+            return self.summary.timed('extract', self.extract_records())
+        return self.parse_fragments(self.summary.timed('extract', self.extract_list_content()), seen_keys=self.seen_keys())
+
+    def load_page(self):
+        """Navigate and wait for the stream; a verification page that does not clear raises VerificationPageError"""
+        self.driver.get(self.url)
+        wait_until_ready(self.driver, self.browser_profile)
+        wait_out_verification(self.driver)
+
+    def scroll_to_bottom(self):
+        """Scroll until the stream stops growing or reaches items outside the age window or already saved"""
+        seen_links = self.high_water.seen_links if self.high_water else None
+        scrolls = scroll_stream(self.driver, self.selector_plan().adapter, max_hour=self.MAX_HOUR, max_day=self.MAX_DAY,
+                                seen_links=seen_links, pause_range=self.SCROLL_PAUSE)
+        self.summary.count('scrolls', scrolls)
+
+    def extract_records(self):
+        """Parse page_source once, yielding records as the container is walked (age cutoff and high-water mark included)"""
+        logger.info("[EXTRACT] Parsing page source in a single pass...")
+        page = StreamPage()
+        plan = self.selector_plan()
+        yield from iter_stream(
+            self.driver.page_source, page, max_hour=self.MAX_HOUR, max_day=self.MAX_DAY,
+            seen_keys=self.seen_keys(), container_selectors=plan.container_xpaths()
+        )
+        if not page.has_container:
+            raise ExtractionError("No suitable container element found")
+        plan.remember('container', page.container_selector)
+
+        logger.info(f"[EXTRACT] {self.OK} Found container using {page.container_selector}")
+        logger.info(f"[EXTRACT] {self.OK} Kept {page.kept_count} of {page.item_count} items")
+        if not page.kept_count and not page.seen_reached:
+            raise ExtractionError("No items kept from the stream")
+
+    def extract_list_content(self):
+        """Yield the outerHTML of each stream item in the age window, one WebDriver lookup at a time"""
+        try:
+            logger.info("[EXTRACT] Analyzing page structure...")
+            logger.info(f"[EXTRACT] Page title: {self.driver.title}")
+
+            # Container fallbacks from the site adapter, the one that matched last time first
+            plan = self.selector_plan()
+            ul_element, used_selector = plan.find_container(self.driver)
+            if ul_element:
+                logger.info(f"[EXTRACT] {self.OK} Found element using {used_selector}")
+
+            if not ul_element:
+                logger.info("[EXTRACT] Attempting to find any list items on page...")
+                try:
+                    # Try to find any list items
+                    list_items = self.driver.find_elements(By.TAG_NAME, 'li')
+                    if list_items:
+                        logger.info(f"[EXTRACT] Found {len(list_items)} general list items")
+                        ul_element = list_items[0].find_element(By.XPATH, '..')
+                except Exception:
+                    logger.info("[EXTRACT] No list items found")
+
+            if ul_element:
+                logger.info("[EXTRACT] Finding list items...")
+                list_items = ul_element.find_elements(By.CSS_SELECTOR, plan.adapter.item)
+                logger.info(f"[EXTRACT] Found {len(list_items)} items")
+
+                # Debug the first item if available
+                if list_items:
+                    logger.debug("[EXTRACT] First item HTML:")
+                    logger.debug(list_items[0].get_attribute('outerHTML'))
+
+                valid_count = 0
+                processed_count = 0
+
+                for item in list_items:
+                    try:
+                        processed_count += 1
+                        logger.debug(f"[PROCESS] Processing item {processed_count}/{len(list_items)}")
+
+                        time_text = plan.find_time(item)
+                        logger.debug(f"[PROCESS] Time: {time_text}")
+
+                        if not time_text:
+                            logger.debug("[PROCESS] ⚠ No time element found, skipping age check")
+                            valid_count += 1
+                            yield item.get_attribute('outerHTML')
+                            continue
+
+                        if is_too_old(time_text, self.MAX_HOUR, self.MAX_DAY):
+                            logger.info(f"[PROCESS] ⚠ Data too old ({time_text}), stopping")
+                            break
+
+                        valid_count += 1
+                        yield item.get_attribute('outerHTML')
+                        logger.debug(f"[PROCESS] {self.OK} Item processed successfully")
+
+                    except Exception as e:
+                        logger.error(f"[ERROR] Failed to process item: {str(e)}")
+                        continue
+
+                logger.info(f"[EXTRACT] {self.OK} Successfully extracted {valid_count} valid items ({plan.failed_lookups} failed selector lookups)")
+                if not valid_count:
+                    raise ExtractionError("No content extracted")
+            else:
+                raise ExtractionError("No suitable container element found")
+
+        except ExtractionError:
+            raise
+        except Exception as e:
+            # Print page source for debugging
+            logger.debug("[DEBUG] Page source:")
+            logger.debug(self.driver.page_source[:1000] + "...")  # First 1000 chars
+            raise ExtractionError(f"Content extraction failed: {e}")
+
+    def parse_fragments(self, fragments, seen_keys=None):
+        """
+        Parse item outerHTML fragments one at a time as they arrive from extract_list_content.
+        Stops at the first item in seen_keys (the high-water mark), which also ends the lookups.
+        """
+        logger.info(f"[JSON] Parsing items with the {self.parser_backend} backend...")
+        # Only the parsing itself counts as 'parse'; fetching the fragments is 'extract'
+        elapsed = 0.0
+        try:
+            for fragment in fragments:
+                started = time.perf_counter()
+                records = parse_items(fragment, backend=self.parser_backend)
+                elapsed += time.perf_counter() - started
+                for record in records:
+                    if seen_keys and item_key(record) in seen_keys:
+                        logger.info(f"[PROCESS] Reached items already scraped ({record.get('link', '')}), stopping")
+                        return
+                    yield record
+        finally:
+            self.summary.charge('parse', elapsed)
+
+    def get_snapshot_path(self):
+        """Path of the current hour's snapshot: fetch-data/<domain>/<date>/<hour>/<domain>-<date>-<hour>.txt"""
+        domain = domain_from_url(self.url)
+
+        origin = "fetch-data"
+        now = datetime.now()
+        date_str = now.strftime("%Y-%m-%d")
+        hour_str = now.strftime("%H")
+
+        folder_path = os.path.join(origin, domain, date_str, hour_str)
+        file_name = f"{domain}-{now.strftime('%Y-%m-%d-%H')}.txt"
+        return os.path.join(folder_path, file_name)
+
+    def save_records(self, records):
+        """Push records through the configured sinks as they arrive; returns a pipeline.PipelineResult"""
+        result = run_pipeline(records, self.build_sinks(), summary=self.summary)
+        if result.saved and self.fingerprint:
+            self.fingerprint.commit()
+        return result
+
+    def build_sinks(self):
+        """Storage backends first (they decide whether the run was saved), then the index and high-water mark"""
+        domain = domain_from_url(self.url)
+        sinks = []
+        if self.storage in ('ndjson', 'both'):
+            if not self.item_store or self.item_store.domain != domain:
+                self.item_store = ItemStore(domain)
+            sinks.append(NdjsonSink(self.item_store, fetched_at=self.fetched_at))
+        if self.storage in ('snapshot', 'both'):
+            sinks.append(SnapshotSink(self.get_snapshot_path(), domain, self.compression, merge_existing=self.incremental))
+        if self.index:
+            if not self.news_index:
+                self.news_index = NewsIndex()
+            sinks.append(IndexSink(self.news_index, domain, fetched_at=self.fetched_at))
+        if self.high_water:
+            sinks.append(HighWaterSink(self.high_water))
+        return sinks + list(self.sinks)
+
+    def cleanup(self):
+        """Clean up resources"""
+        if self.driver:
+            self.close_driver()
+            logger.info(f"[CLEANUP] {self.OK} Browser closed")
+        if self.news_index:
+            self.news_index.close()
+            self.news_index = None
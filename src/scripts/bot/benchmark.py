@@ -0,0 +1,401 @@
+import argparse
+import html
+import importlib.util
+import json
+import logging
+import multiprocessing
+import os
+import re
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from archive_compaction import iter_snapshots
+from log_setup import setup_logging, stop_logging
+from snapshot_io import read_snapshot
+from stream_parser import PARSER_BACKENDS, item_key, parse_items, parse_stream
+
+
+logger = logging.getLogger(__name__)
+
+BOT_DIR = os.path.dirname(os.path.abspath(__file__))
+OPENAI_DIR = os.path.join(os.path.dirname(BOT_DIR), "openai")
+SOURCE_DIR = "fetch-data"
+RECORDED_DOMAIN = "tradingeconomics_com"
+
+# Import-time budgets (ms, cumulative per python -X importtime) for scripts started once per job
+STARTUP_BUDGETS = {
+    'analyze_news': (OPENAI_DIR, 150),
+}
+STARTUP_RUNS = 5
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+LARGE_PAGE_ITEMS = 2000
+SCROLL_PAGE_ITEMS = 400
+SCROLL_CHUNK = 25
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body><div class="container"><ul id="stream" class="list-group">
+{items}
+</ul></div>{script}</body></html>"""
+
+ITEM_TEMPLATE = """<li class="list-group-item te-stream-item">
+    {title}
+    <span class="te-stream-item-description">{content}</span>
+    <div class="te-stream-item-date"><small>{time}</small> <span class="te-stream-share">share</span></div>
+</li>"""
+
+# Appends the hidden items a chunk at a time whenever the window nears the bottom, like the live stream
+SCROLL_SCRIPT = """<template id="more">{hidden}</template>
+<script>
+const pending = Array.from(document.getElementById('more').content.children);
+window.addEventListener('scroll', () => {{
+    if (!pending.length || window.innerHeight + window.scrollY < document.body.scrollHeight - 200) return;
+    setTimeout(() => {{
+        const stream = document.getElementById('stream');
+        pending.splice(0, {chunk}).forEach(item => stream.appendChild(item));
+    }}, 150);
+}});
+</script>"""
+
+VERIFICATION_PAGE = """<!DOCTYPE html>
+<html><head><title>Human Verification</title></head>
+<body><div id="challenge"><p>Please verify you are a human.</p></div></body></html>"""
+
+
+def render_item(record):
+    title = ''
+    if record.get('link'):
+        title = (f'<div class="te-stream-title-div"><a class="te-stream-title" href="{html.escape(record["link"])}">'
+                 f'{html.escape(record.get("title", ""))}</a></div>')
+    content = record.get('content', '')
+    if record.get('title') and content.startswith(record['title']):
+        content = content[len(record['title']):]
+    return ITEM_TEMPLATE.format(title=title, content=html.escape(content.strip()), time=html.escape(record.get('time', '')))
+
+
+def render_page(records, title="Stream | Trading Economics", script=''):
+    return PAGE_TEMPLATE.format(title=title, items='\n'.join(render_item(record) for record in records), script=script)
+
+
+def load_recorded_records(source_dir=SOURCE_DIR, domain=RECORDED_DOMAIN):
+    """Unique items from the recorded snapshots, in stream order"""
+    records, seen = [], set()
+    for _, _, path in iter_snapshots(source_dir, domain):
+        try:
+            snapshot = read_snapshot(path)
+        except (OSError, ValueError, RuntimeError) as e:
+            logger.warning(f"[BENCH] Skipping unreadable snapshot {path}: {e}")
+            continue
+        for record in snapshot:
+            key = item_key(record)
+            if key not in seen:
+                seen.add(key)
+                records.append(record)
+    return records
+
+
+def _with_age(records, count):
+    """Repeat records to `count` items with ages growing down the page, ending past the 2-day cutoff"""
+    aged = []
+    for position in range(count):
+        record = dict(records[position % len(records)])
+        minutes = position * 2
+        record['time'] = f"{minutes} minutes ago" if minutes < 60 else f"{minutes // 60} hours ago"
+        aged.append(record)
+    aged[-1]['time'] = "3 days ago"
+    return aged
+
+
+def build_fixtures(out_dir, records):
+    """Write the benchmark pages; returns {fixture name: file name}"""
+    if not records:
+        raise RuntimeError("No recorded items found; pass --source pointing at a fetch-data folder")
+
+    large = _with_age(records, LARGE_PAGE_ITEMS)
+    scroll = _with_age(records, SCROLL_PAGE_ITEMS)
+    hidden = '\n'.join(render_item(record) for record in scroll[SCROLL_CHUNK:])
+    pages = {
+        'recorded': render_page(records),
+        'large': render_page(large),
+        'scroll': render_page(scroll[:SCROLL_CHUNK], script=SCROLL_SCRIPT.format(hidden=hidden, chunk=SCROLL_CHUNK)),
+        'verification': VERIFICATION_PAGE,
+        # Verification interstitial that still carries a stale stream, as some challenge pages do
+        'verification-stream': render_page(records[:10], title="Human Verification"),
+    }
+    files = {}
+    for name, page in pages.items():
+        files[name] = f"{name}.html"
+        with open(os.path.join(out_dir, files[name]), 'w', encoding='utf-8') as file:
+            file.write(page)
+    return files
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(directory):
+    """Serve `directory` on a free localhost port; returns (server, base URL)"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), partial(_QuietHandler, directory=directory))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def percentile(values, fraction):
+    """Linear-interpolated percentile of a list of numbers"""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def _load_script(file_name, module_name):
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(BOT_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _prepare_parse(fixture, backend, base_url, fixture_dir):
+    with open(os.path.join(fixture_dir, f"{fixture}.html"), 'r', encoding='utf-8') as file:
+        page_html = file.read()
+    if backend == 'single-pass':
+        return lambda: len(parse_stream(page_html, max_hour=48, max_day=2).records), lambda: None
+    return lambda: len(parse_items(page_html, backend=backend)), lambda: None
+
+
+def _prepare_http(fixture, _, base_url, fixture_dir):
+    from http_fetcher import HttpStreamFetcher
+
+    fetcher = HttpStreamFetcher()
+    url = f"{base_url}/{fixture}.html"
+    return lambda: len(fetcher.fetch(url).records), fetcher.session.close
+
+
+def _prepare_selenium(fixture, extraction, base_url, fixture_dir):
+    scraper_module = _load_script("fetch-html-background.py", "fetch_html_background")
+    scraper = scraper_module.BackgroundURLScraper(
+        f"{base_url}/{fixture}.html", engine='auto', extraction=extraction, incremental=False, index=False, metrics=False
+    )
+    scraper.setup_driver()
+
+    def run():
+        return sum(1 for _ in scraper.load_and_extract())
+
+    return run, scraper.cleanup
+
+
+PREPARERS = {
+    'parse': _prepare_parse,
+    'http': _prepare_http,
+    'selenium': _prepare_selenium,
+}
+
+
+def build_cases(include_selenium=True):
+    """(engine, variant, fixture) for every benchmark case"""
+    cases = []
+    for backend in ['single-pass'] + sorted(PARSER_BACKENDS):
+        for fixture in ('recorded', 'large'):
+            cases.append(('parse', backend, fixture))
+    for fixture in ('recorded', 'large', 'verification', 'verification-stream'):
+        cases.append(('http', 'lxml', fixture))
+    if include_selenium:
+        for extraction in ('single-pass', 'legacy'):
+            for fixture in ('recorded', 'scroll'):
+                cases.append(('selenium', extraction, fixture))
+    return cases
+
+
+def run_case(case, iterations, warmup, base_url, fixture_dir):
+    """Run one case in the current (fresh) process and return its measurements"""
+    engine, variant, fixture = case
+    try:
+        run, cleanup = PREPARERS[engine](fixture, variant, base_url, fixture_dir)
+    except Exception as e:
+        return {"case": '/'.join(case), "skipped": str(e).splitlines()[0] if str(e) else type(e).__name__}
+
+    latencies, items, errors = [], 0, 0
+    try:
+        for _ in range(warmup):
+            run()
+        started = time.perf_counter()
+        for _ in range(iterations):
+            call_started = time.perf_counter()
+            try:
+                items += run()
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - call_started)
+        wall = time.perf_counter() - started
+    finally:
+        cleanup()
+
+    return {
+        "case": '/'.join(case),
+        "iterations": iterations,
+        "errors": errors,
+        "items_per_run": items / iterations if iterations else 0,
+        "runs_per_s": iterations / wall if wall else 0,
+        "items_per_s": items / wall if wall else 0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "max_ms": max(latencies) * 1000 if latencies else 0,
+        # ru_maxrss is KiB on Linux; browser processes are children of this worker
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "children_peak_rss_mb": resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+    }
+
+
+def run_isolated(case, iterations, warmup, base_url, fixture_dir):
+    """Run a case in a new spawned process so peak RSS belongs to that case alone"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(run_case, case, iterations, warmup, base_url, fixture_dir).result()
+
+
+def parse_importtime(output):
+    """{module: (self µs, cumulative µs)} from python -X importtime output"""
+    timings = {}
+    for line in output.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            timings[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return timings
+
+
+def measure_startup(module, module_dir, budget_ms, runs=STARTUP_RUNS, cwd=None):
+    """Median import time of a per-job script, each run in a fresh interpreter"""
+    env = dict(os.environ, PYTHONPATH=module_dir)
+    import_ms, wall_ms, slowest = [], [], {}
+    for _ in range(runs):
+        started = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=cwd, env=env, capture_output=True, text=True
+        )
+        wall_ms.append((time.perf_counter() - started) * 1000)
+        timings = parse_importtime(completed.stderr)
+        if completed.returncode or module not in timings:
+            errors = [line for line in completed.stderr.splitlines() if not line.startswith('import time:')]
+            return {"case": f"startup/{module}", "skipped": errors[-1] if errors else f"exit code {completed.returncode}"}
+        import_ms.append(timings[module][1] / 1000)
+        for name, (self_us, _) in timings.items():
+            slowest[name] = slowest.get(name, 0) + self_us / 1000 / runs
+
+    median = statistics.median(import_ms)
+    return {
+        "case": f"startup/{module}",
+        "runs": runs,
+        "import_ms": median,
+        "wall_ms": statistics.median(wall_ms),
+        "budget_ms": budget_ms,
+        "within_budget": median <= budget_ms,
+        # Modules with the highest self time, to see what to make lazy next
+        "slowest": sorted(slowest.items(), key=lambda entry: entry[1], reverse=True)[:5],
+    }
+
+
+def format_startup(results):
+    lines = []
+    for result in results:
+        if 'skipped' in result:
+            lines.append(f"{result['case']:<40} skipped: {result['skipped']}")
+            continue
+        verdict = 'ok' if result['within_budget'] else 'OVER BUDGET'
+        slowest = ', '.join(f"{name} {ms:.1f}" for name, ms in result['slowest'])
+        lines.append(
+            f"{result['case']:<40} import {result['import_ms']:.1f} ms (budget {result['budget_ms']} ms, {verdict}), "
+            f"process {result['wall_ms']:.0f} ms; slowest: {slowest}"
+        )
+    return '\n'.join(lines)
+
+
+def format_table(results):
+    header = f"{'case':<40} {'items':>7} {'runs/s':>9} {'items/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'rss MB':>7} {'err':>4}"
+    lines = [header, '-' * len(header)]
+    for result in results:
+        if 'skipped' in result:
+            lines.append(f"{result['case']:<40} skipped: {result['skipped']}")
+            continue
+        lines.append(
+            f"{result['case']:<40} {result['items_per_run']:>7.0f} {result['runs_per_s']:>9.1f} {result['items_per_s']:>10.0f} "
+            f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f} "
+            f"{max(result['peak_rss_mb'], result['children_peak_rss_mb']):>7.0f} {result['errors']:>4}"
+        )
+    return '\n'.join(lines)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Benchmark fetch, extraction and parsing against recorded pages served locally")
+    parser.add_argument('--source', default=SOURCE_DIR, help="fetch-data folder holding the recorded snapshots")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--only', help="Regex on case names (engine/variant/fixture)")
+    parser.add_argument('--no-selenium', action='store_true', help="Skip the browser cases")
+    parser.add_argument('--no-startup', action='store_true', help="Skip the import-time budget checks")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    fixture_dir = tempfile.mkdtemp(prefix="scraper-bench-")
+    server = None
+    try:
+        files = build_fixtures(fixture_dir, load_recorded_records(args.source))
+        server, base_url = serve(fixture_dir)
+        logger.info(f"[BENCH] Serving {len(files)} fixtures from {base_url}")
+
+        cases = build_cases(include_selenium=not args.no_selenium)
+        if args.only:
+            cases = [case for case in cases if re.search(args.only, '/'.join(case))]
+
+        results = []
+        for case in cases:
+            # Browser cases are slow; keep their iteration count modest
+            iterations = max(1, args.iterations // 5) if case[0] == 'selenium' else args.iterations
+            result = run_isolated(case, iterations, args.warmup if case[0] != 'selenium' else 0, base_url, fixture_dir)
+            logger.info(f"[BENCH] {result['case']} done")
+            results.append(result)
+
+        startup = []
+        if not args.no_startup:
+            for module, (module_dir, budget_ms) in STARTUP_BUDGETS.items():
+                if args.only and not re.search(args.only, f"startup/{module}"):
+                    continue
+                # Run in the scratch folder so the scripts' log files do not land in the tree
+                startup.append(measure_startup(module, module_dir, budget_ms, cwd=fixture_dir))
+                logger.info(f"[BENCH] startup/{module} done")
+
+        stop_logging()  # flush queued progress lines before the table
+        print(format_table(results))
+        if startup:
+            print()
+            print(format_startup(startup))
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as file:
+                json.dump({"created_at": time.time(), "python": sys.version.split()[0], "results": results, "startup": startup}, file, indent=2)
+        # Non-zero exit so a CI job notices a heavy import creeping back in
+        return 1 if any(not result.get('within_budget', True) for result in startup) else 0
+    finally:
+        if server:
+            server.shutdown()
+        shutil.rmtree(fixture_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,149 @@
+import json
+import logging
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+logger = logging.getLogger(__name__)
+
+# File extensions per resource type; we only read text from the stream, so none of these are needed
+RESOURCE_EXTENSIONS = {
+    'image': ('png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico'),
+    'font': ('woff', 'woff2', 'ttf', 'otf', 'eot'),
+    'media': ('mp4', 'webm', 'mp3', 'm3u8'),
+    'stylesheet': ('css',),
+}
+
+# Ad, analytics and social hosts that load on news pages
+TRACKER_HOSTS = (
+    'doubleclick.net', 'googlesyndication.com', 'googleadservices.com', 'googletagmanager.com',
+    'google-analytics.com', 'adservice.google.com', 'facebook.net', 'facebook.com',
+    'platform.twitter.com', 'scorecardresearch.com', 'quantserve.com', 'amazon-adsystem.com',
+    'adnxs.com', 'criteo.com', 'taboola.com', 'outbrain.com', 'hotjar.com', 'clarity.ms',
+)
+
+# CSS version of stream_parser.CONTAINER_SELECTORS
+STREAM_SELECTOR = '#stream, .stream, ul[class*="stream"], div[class*="stream"]'
+
+
+class BrowserProfile:
+    """What Chrome may load for one domain, and what to wait for before reading the page"""
+
+    def __init__(self, block=('image', 'font', 'media', 'stylesheet'), block_hosts=TRACKER_HOSTS, block_urls=(),
+                 page_load_strategy='eager', wait_for=STREAM_SELECTOR, wait_timeout=15, page_load_timeout=30):
+        self.block = tuple(block)  # keys of RESOURCE_EXTENSIONS
+        self.block_hosts = tuple(block_hosts)
+        self.block_urls = tuple(block_urls)  # extra Network.setBlockedURLs patterns
+        self.page_load_strategy = page_load_strategy  # 'eager' returns at DOMContentLoaded, 'normal' waits for every resource
+        self.wait_for = wait_for  # CSS selector that marks the page as ready (None: trust the load strategy)
+        self.wait_timeout = wait_timeout
+        self.page_load_timeout = page_load_timeout
+
+    @property
+    def blocked_urls(self):
+        """Patterns for Network.setBlockedURLs ('*' matches any run of characters)"""
+        patterns = []
+        for resource in self.block:
+            for extension in RESOURCE_EXTENSIONS[resource]:
+                patterns += [f"*.{extension}", f"*.{extension}?*"]
+        for host in self.block_hosts:
+            patterns += [f"*://{host}/*", f"*://*.{host}/*"]
+        return patterns + list(self.block_urls)
+
+    def to_dict(self):
+        return {
+            "block": list(self.block),
+            "block_hosts": list(self.block_hosts),
+            "block_urls": list(self.block_urls),
+            "page_load_strategy": self.page_load_strategy,
+            "wait_for": self.wait_for,
+            "wait_timeout": self.wait_timeout,
+            "page_load_timeout": self.page_load_timeout,
+        }
+
+    def merged(self, overrides):
+        """A copy of this profile with some settings replaced"""
+        settings = self.to_dict()
+        unknown = set(overrides) - set(settings)
+        if unknown:
+            raise ValueError(f"Unknown browser profile setting(s): {', '.join(sorted(unknown))}")
+        unknown = set(overrides.get('block', ())) - set(RESOURCE_EXTENSIONS)
+        if unknown:
+            raise ValueError(f"Unknown resource type(s): {', '.join(sorted(unknown))}")
+        settings.update(overrides)
+        return BrowserProfile(**settings)
+
+
+DEFAULT_PROFILE = BrowserProfile()
+
+# Built-in per-domain settings, keyed like the fetch-data/ folders (see scrape_state.domain_from_url)
+DOMAIN_OVERRIDES = {
+    'tradingeconomics_com': {'wait_for': '#stream li.te-stream-item'},
+}
+
+PROFILES = {domain: DEFAULT_PROFILE.merged(overrides) for domain, overrides in DOMAIN_OVERRIDES.items()}
+
+
+def get_profile(domain=None):
+    """Profile for a fetch-data domain name, falling back to the default"""
+    if domain:
+        domain = domain.replace('.', '_')
+        for name in (domain, domain[4:] if domain.startswith('www_') else None):
+            if name in PROFILES:
+                return PROFILES[name]
+    return PROFILES.get('default', DEFAULT_PROFILE)
+
+
+def load_profiles(path):
+    """
+    Add or override profiles from a JSON file such as
+    {"default": {"block": ["image", "font"]}, "example.com": {"page_load_strategy": "normal", "wait_for": null}}.
+    Settings a domain leaves out come from "default".
+    """
+    with open(path, 'r', encoding='utf-8') as file:
+        config = json.load(file)
+
+    default = DEFAULT_PROFILE.merged(config.pop('default', {}))
+    PROFILES['default'] = default
+    for domain, overrides in DOMAIN_OVERRIDES.items():
+        PROFILES[domain] = default.merged(overrides)
+    for domain, overrides in config.items():
+        domain = domain.replace('.', '_')
+        PROFILES[domain] = default.merged(dict(DOMAIN_OVERRIDES.get(domain, {}), **overrides))
+    logger.info(f"[SETUP] Loaded browser profiles for {len(config)} domain(s) from {path}")
+
+
+def apply_options(options, profile):
+    """Settings that have to be fixed before Chrome starts"""
+    options.page_load_strategy = profile.page_load_strategy
+    if 'image' in profile.block:
+        # Also skip decoding images that slip past the URL patterns (e.g. extension-less CDN URLs)
+        options.add_experimental_option('prefs', {'profile.managed_default_content_settings.images': 2})
+    return options
+
+
+def apply_blocking(driver, profile):
+    """Install the profile's URL blocklist on a running session (call again when the session moves to another domain)"""
+    driver.set_page_load_timeout(profile.page_load_timeout)
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': profile.blocked_urls})
+    except Exception as e:
+        logger.warning(f"[SETUP] Resource blocking unavailable: {e}")
+
+
+def wait_until_ready(driver, profile):
+    """Wait for the stream container instead of the full load event; False if it never appeared"""
+    if not profile.wait_for:
+        return True
+    try:
+        WebDriverWait(driver, profile.wait_timeout).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, profile.wait_for))
+        )
+        return True
+    except TimeoutException:
+        logger.warning(f"[FETCH] '{profile.wait_for}' did not appear within {profile.wait_timeout}s")
+        return False
@@ -0,0 +1,212 @@
+import logging
+import os
+import queue
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from webdriver_manager.chrome import ChromeDriverManager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+logger = logging.getLogger(__name__)
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def get_driver_path():
+    """Resolve the chromedriver binary once per process"""
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+def is_alive(driver):
+    """Cheap liveness probe: one script round-trip, False if the session or browser is gone"""
+    try:
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+
+def process_tree_rss(pid):
+    """Resident memory in bytes of a process and all its descendants, or None if it cannot be measured"""
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    if not os.path.isdir('/proc'):
+        return None
+    children = defaultdict(list)
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as file:
+                stat = file.read()
+        except OSError:
+            continue
+        # Fields after the parenthesised command name: state, ppid, ...
+        children[int(stat.rsplit(')', 1)[1].split()[1])].append(int(entry))
+
+    total, pending, page_size = 0, [pid], os.sysconf('SC_PAGE_SIZE')
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/statm', 'r') as file:
+                total += int(file.read().split()[1]) * page_size
+        except (OSError, ValueError, IndexError):
+            if current == pid:
+                return None
+        pending += children.get(current, [])
+    return total
+
+
+def driver_rss(driver):
+    """Memory held by chromedriver and the Chrome processes it started"""
+    process = getattr(getattr(driver, 'service', None), 'process', None)
+    return process_tree_rss(process.pid) if process else None
+
+
+class DriverLifecycle:
+    """Decides when a session should be replaced: it crashed, served max_uses fetches, or grew past max_rss_mb"""
+
+    def __init__(self, max_uses=50, max_rss_mb=1024):
+        self.max_uses = max_uses
+        self.max_rss_mb = max_rss_mb
+        self.uses = {}
+        self.lock = threading.Lock()
+
+    def used(self, driver):
+        with self.lock:
+            self.uses[driver] = self.uses.get(driver, 0) + 1
+
+    def forget(self, driver):
+        with self.lock:
+            self.uses.pop(driver, None)
+
+    def retire_reason(self, driver):
+        """Why the session should not be used again, or None if it is healthy"""
+        if not is_alive(driver):
+            return "not responding"
+        uses = self.uses.get(driver, 0)
+        if self.max_uses and uses >= self.max_uses:
+            return f"served {uses} fetches"
+        if self.max_rss_mb:
+            rss = driver_rss(driver)
+            if rss is not None and rss > self.max_rss_mb * 1024 * 1024:
+                return f"using {rss / (1024 * 1024):.0f} MB"
+        return None
+
+
+class DriverPool:
+    """Bounded pool of WebDriver sessions shared by several scrapers"""
+
+    def __init__(self, factory, size=2, lifecycle=None):
+        self.factory = factory
+        self.size = size
+        self.lifecycle = lifecycle  # DriverLifecycle: recycle crashed, worn-out or bloated sessions on acquire
+        self.idle = queue.LifoQueue()  # most recently used (warmest) session first
+        self.drivers = []
+        self.lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """Borrow a healthy session, replacing idle ones the lifecycle retires"""
+        while True:
+            driver, started = self._acquire(timeout)
+            reason = self.lifecycle.retire_reason(driver) if self.lifecycle and not started else None
+            if not reason:
+                return driver
+            logger.info(f"[POOL] Recycling browser session ({reason})")
+            self.discard(driver)
+
+    def _acquire(self, timeout):
+        """(driver, whether it was just started): an idle session, or a new one while below the pool size"""
+        try:
+            return self.idle.get_nowait(), False
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            can_create = len(self.drivers) < self.size
+            if can_create:
+                self.drivers.append(None)  # reserve the slot while the browser starts
+
+        if not can_create:
+            return self.idle.get(timeout=timeout), False
+
+        try:
+            driver = self.factory()
+        except Exception:
+            with self.lock:
+                self.drivers.remove(None)
+            raise
+
+        with self.lock:
+            self.drivers[self.drivers.index(None)] = driver
+        return driver, True
+
+    def release(self, driver):
+        if self.lifecycle:
+            self.lifecycle.used(driver)
+        self.idle.put(driver)
+
+    def discard(self, driver):
+        """Quit a broken session and free its slot"""
+        with self.lock:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+        if self.lifecycle:
+            self.lifecycle.forget(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.error(f"[POOL] Failed to quit discarded driver: {e}")
+
+    @contextmanager
+    def driver(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        except Exception:
+            self.give_back(driver, failed=True)
+            raise
+        self.give_back(driver)
+
+    def give_back(self, driver, failed=False):
+        """Release a session after use, or discard it if the failure took the browser down"""
+        if failed and not is_alive(driver):
+            logger.info("[POOL] Discarding crashed browser session")
+            self.discard(driver)
+        else:
+            self.release(driver)
+
+    def close(self):
+        """Quit every session the pool started"""
+        with self.lock:
+            drivers = [driver for driver in self.drivers if driver is not None]
+            self.drivers = []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.error(f"[POOL] Failed to quit driver: {e}")
+        logger.info(f"[POOL] Closed {len(drivers)} browser session(s)")
@@ -1,361 +1,291 @@
-import schedule
-import time
 import logging
-from datetime import datetime
-import re
-import os
 import sys
 import json
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
+import argparse
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-from selenium.webdriver.chrome.options import Options
-
-
-# Configure logging with timestamp
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(message)s',
-    handlers=[
-        logging.FileHandler("scraper.log"),
-        logging.StreamHandler()
-    ]
-)
-
-class BackgroundURLScraper:
-    def __init__(self, url):
-        print(f"\n{'='*50}")
-        print(f"Initializing scraper for URL: {url}")
-        print(f"{'='*50}\n")
-        self.url = url
-        self.MAX_DAY = 2
-        self.MAX_HOUR = 48
-        self.setup_driver()
-        
+
+from base_scraper import BaseScraper
+from log_setup import add_logging_arguments, setup_logging
+from stream_parser import PARSER_BACKENDS
+from snapshot_io import COMPRESSION_SUFFIXES
+from scrape_state import domain_from_url
+from driver_pool import DriverLifecycle, DriverPool, get_driver_path
+from browser_profile import apply_blocking, apply_options, get_profile, load_profiles
+from fetch_policy import FetchPolicy
+from scheduler import AsyncScheduler
+from work_queue import QUEUE_PATH, DeferJob, WorkQueue, default_owner, run_worker
+
+
+logger = logging.getLogger(__name__)
+
+def create_driver(profile=None):
+    """Start a headless Chrome session with a lean browser profile (see browser_profile.py)"""
+    profile = profile or get_profile()
+    logger.info("[SETUP] Configuring Chrome options...")
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--enable-unsafe-swiftshader")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--disable-search-engine-choice-screen")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-notifications")
+    options.add_argument("--ignore-certificate-errors")
+    options.add_argument("--ignore-ssl-errors")
+    options.add_argument('--disable-javascript')  # Try without JavaScript first
+    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36")
+    apply_options(options, profile)
+    
+    logger.info("[SETUP] Initializing Chrome driver...")
+    driver = webdriver.Chrome(
+        service=Service(get_driver_path()),
+        options=options
+    )
+    
+    # Page load timeout and blocked URLs
+    apply_blocking(driver, profile)
+    
+    logger.info("[SETUP] ✓ Browser initialized successfully in headless mode")
+    return driver
+
+
+class BackgroundURLScraper(BaseScraper):
+    def __init__(self, url, engine='auto', extraction='single-pass', incremental=True, parser_backend='lxml', storage='snapshot', index=True, compression='none', metrics=True, driver_pool=None, lifecycle=None, policy=None, sinks=()):
+        super().__init__(url, engine=engine, extraction=extraction, incremental=incremental, parser_backend=parser_backend, storage=storage, index=index, compression=compression, metrics=metrics, lifecycle=lifecycle, policy=policy, sinks=sinks)
+        self.driver_pool = driver_pool  # shared sessions in multi-source mode (the pool has its own lifecycle)
+        self.browser_profile = get_profile(domain_from_url(url))  # blocked resources, load strategy, ready selector
+        if self.engine == 'selenium' and not self.driver_pool:
+            self.setup_driver()
+
     def setup_driver(self):
         """Configure headless browser"""
         try:
-            print("\n[SETUP] Configuring Chrome options...")
-            options = webdriver.ChromeOptions()
-            options.add_argument("--headless=new")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--enable-unsafe-swiftshader")
-            options.add_argument("--no-sandbox")
-            options.add_argument("--disable-dev-shm-usage")
-            options.add_argument("--window-size=1920,1080")
-            options.add_argument("--disable-search-engine-choice-screen")
-            options.add_argument("--disable-blink-features=AutomationControlled")
-            options.add_argument("--disable-extensions")
-            options.add_argument("--disable-notifications")
-            options.add_argument("--ignore-certificate-errors")
-            options.add_argument("--ignore-ssl-errors")
-            options.add_argument('--disable-javascript')  # Try without JavaScript first
-            options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36")
-            
-            print("[SETUP] Initializing Chrome driver...")
-            self.driver = webdriver.Chrome(
-                service=Service(ChromeDriverManager().install()),
-                options=options
-            )
-            
-            # Set page load timeout
-            self.driver.set_page_load_timeout(30)
-            
-            print("[SETUP] ✓ Browser initialized successfully in headless mode")
+            self.driver = create_driver(self.browser_profile)
         except Exception as e:
-            print(f"[ERROR] Browser initialization failed: {str(e)}")
+            logger.error(f"[ERROR] Browser initialization failed: {str(e)}")
             raise
 
-    def fetch_data(self):
-        """Main fetch operation"""
-        try:
-            print(f"\n{'='*50}")
-            print(f"Starting new fetch operation at {datetime.now()}")
-            print(f"{'='*50}")
-            
-            print(f"\n[FETCH] Loading URL: {self.url}")
-            self.driver.get(self.url)
-            
-            print("[FETCH] Scrolling page to load dynamic content...")
-            self.scroll_to_bottom()
-            
-            print("[FETCH] Extracting content...")
-            content = self.extract_list_content()
-            
-            if content:
-                print("[FETCH] Converting content to JSON...")
-                json_data = self.extract_data_as_json(content)
-                
-                if json_data:
-                    print("[FETCH] Saving data to file...")
-                    self.save_to_file(json_data)
-                    print("[FETCH] ✓ Fetch operation completed successfully")
-                else:
-                    print("[ERROR] Failed to convert content to JSON")
-            else:
-                print("[ERROR] No content extracted")
-                
-        except Exception as e:
-            print(f"[ERROR] Fetch operation failed: {e}")
-            
-            
-            
-
-    def scroll_to_bottom(self):
-        """Scroll to load dynamic content"""
-        scroll_count = 0
-        last_height = self.driver.execute_script("return document.body.scrollHeight")
-        
-        while True:
-            scroll_count += 1
-            print(f"[SCROLL] Scroll attempt #{scroll_count}")
-            
-            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(3)
-            
-            new_height = self.driver.execute_script("return document.body.scrollHeight")
-            if new_height == last_height:
-                print("[SCROLL] ✓ Reached bottom of page")
-                break
-                
-            print(f"[SCROLL] New content loaded (Height: {new_height}px)")
-            last_height = new_height
-
-    def extract_list_content(self):
-        """Extract HTML content"""
-        try:
-            print("[EXTRACT] Analyzing page structure...")
-            # First, let's print the page source to debug
-            page_source = self.driver.page_source
-            print("[EXTRACT] Page title:", self.driver.title)
-            
-            # Try different possible selectors
-            possible_selectors = [
-                ('//*[@id="stream"]', "Stream ID"),
-                ('//*[@class="stream"]', "Stream Class"),
-                ('//ul[contains(@class, "stream")]', "Stream UL"),
-                ('//div[contains(@class, "stream")]', "Stream DIV")
-            ]
-            
-            ul_element = None
-            used_selector = None
-            
-            for selector, selector_name in possible_selectors:
-                print(f"[EXTRACT] Trying selector: {selector_name}")
-                try:
-                    ul_element = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.XPATH, selector))
-                    )
-                    if ul_element:
-                        print(f"[EXTRACT] ✓ Found element using {selector_name}")
-                        used_selector = selector_name
-                        break
-                except Exception as e:
-                    print(f"[EXTRACT] {selector_name} not found, trying next...")
-            
-            if not ul_element:
-                print("[EXTRACT] Attempting to find any list items on page...")
-                try:
-                    # Try to find any list items
-                    list_items = self.driver.find_elements(By.TAG_NAME, 'li')
-                    if list_items:
-                        print(f"[EXTRACT] Found {len(list_items)} general list items")
-                        ul_element = list_items[0].find_element(By.XPATH, '..')
-                except Exception as e:
-                    print("[EXTRACT] No list items found")
-            
-            if ul_element:
-                print("[EXTRACT] Finding list items...")
-                list_items = ul_element.find_elements(By.TAG_NAME, 'li')
-                print(f"[EXTRACT] Found {len(list_items)} items")
-                
-                # Debug the first item if available
-                if list_items:
-                    print("[EXTRACT] First item HTML:")
-                    print(list_items[0].get_attribute('outerHTML'))
-                
-                valid_data = []
-                processed_count = 0
-
-                for item in list_items:
-                    try:
-                        processed_count += 1
-                        print(f"\n[PROCESS] Processing item {processed_count}/{len(list_items)}")
-                        
-                        # Try different time element selectors
-                        time_selectors = [
-                            ('small', 'Small tag'),
-                            ('span[contains(@class, "time")]', 'Time span'),
-                            ('div[contains(@class, "time")]', 'Time div'),
-                            ('*[contains(text(), "ago")]', 'Text containing ago')
-                        ]
-                        
-                        time_text = None
-                        for selector, selector_name in time_selectors:
-                            try:
-                                time_element = item.find_element(By.CSS_SELECTOR, selector)
-                                time_text = time_element.text.strip()
-                                print(f"[PROCESS] Time found using {selector_name}: {time_text}")
-                                break
-                            except:
-                                continue
-                        
-                        if not time_text:
-                            print("[PROCESS] ⚠ No time element found, skipping age check")
-                            valid_data.append(item.get_attribute('outerHTML'))
-                            continue
-
-                        hours_match = re.search(r'(\d+)\s+hours?\s+ago', time_text)
-                        days_match = re.search(r'(\d+)\s+days?\s+ago', time_text)
-
-                        if hours_match:
-                            hours_ago = int(hours_match.group(1))
-                            if hours_ago > self.MAX_HOUR:
-                                print(f"[PROCESS] ⚠ Data too old ({hours_ago} hours), stopping")
-                                break
-                        elif days_match:
-                            days_ago = int(days_match.group(1))
-                            if days_ago >= self.MAX_DAY:
-                                print(f"[PROCESS] ⚠ Data too old ({days_ago} days), stopping")
-                                break
-
-                        valid_data.append(item.get_attribute('outerHTML'))
-                        print("[PROCESS] ✓ Item processed successfully")
-
-                    except Exception as e:
-                        print(f"[ERROR] Failed to process item: {str(e)}")
-                        continue
-
-                print(f"\n[EXTRACT] ✓ Successfully extracted {len(valid_data)} valid items")
-                return '\n\n\n'.join(valid_data)
-            else:
-                print("[ERROR] No suitable container element found")
-                return None
+    @contextmanager
+    def browser_session(self):
+        """Hold a Chrome session for one fetch, borrowing it from the shared pool when there is one"""
+        if not self.driver_pool:
+            with super().browser_session() as driver:
+                yield driver
+            return
 
-        except Exception as e:
-            print(f"[ERROR] Content extraction failed: {str(e)}")
-            # Print page source for debugging
-            print("\n[DEBUG] Page source:")
-            print(self.driver.page_source[:1000] + "...")  # Print first 1000 chars
-            return None
-
-    def extract_data_as_json(self, html_content):
-        """Convert to JSON format"""
+        with self.summary.phase('setup'):
+            self.driver = self.driver_pool.acquire()
+        failed = False
         try:
-            print("[JSON] Parsing HTML content...")
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            print("[JSON] Finding stream items...")
-            list_items = soup.find_all('li', class_='te-stream-item')
-            print(f"[JSON] Found {len(list_items)} items to process")
-            
-            data_list = []
-            
-            for i, li in enumerate(list_items, 1):
-                try:
-                    print(f"[JSON] Processing item {i}/{len(list_items)}")
-                    
-                    title_element = li.select_one('div.te-stream-title-div a.te-stream-title, a.te-stream-title-2')
-                    title = title_element.get_text(strip=True) if title_element else ''
-                    link = title_element['href'] if title_element else ''
-                    
-                    time_element = li.find('small')
-                    time_text = time_element.get_text(strip=True) if time_element else ''
-                    
-                    content = li.get_text(separator=' ').split(time_text)[0].strip() if time_text else li.get_text(separator=' ').strip()
-                    
-                    data_list.append({
-                        "title": title,
-                        "link": link,
-                        "time": time_text,
-                        "content": content
-                    })
-                    print(f"[JSON] ✓ Item {i} processed successfully")
-                
-                except Exception as e:
-                    print(f"[ERROR] Failed to process JSON item {i}: {e}")
-                    continue
-            
-            print(f"[JSON] ✓ Successfully converted {len(data_list)} items to JSON")
-            return json.dumps(data_list, indent=4)
+            yield self.driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.driver_pool.give_back(self.driver, failed=failed)
+            self.driver = None
 
-        except Exception as e:
-            print(f"[ERROR] JSON conversion failed: {e}")
-            return None
-
-    def save_to_file(self, data):
-        """Save data to file"""
-        parsed_url = urlparse(self.url)
-        domain = parsed_url.netloc.replace('.', '_')
-        
-        print(f"[SAVE] Preparing to save data for domain: {domain}")
-        
-        origin = "fetch-data"
-        now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
-        hour_str = now.strftime("%H")
-        
-        folder_path = os.path.join(origin, domain, date_str, hour_str)
-        os.makedirs(folder_path, exist_ok=True)
-        
-        file_name = f"{domain}-{now.strftime('%Y-%m-%d-%H')}.txt"
-        file_path = os.path.join(folder_path, file_name)
-        
-        print(f"[SAVE] Saving to: {file_path}")
-        
+    def run_schedule(self, interval=3600, jitter=0, max_catch_up=1):
+        """Run scheduled scraping until SIGINT/SIGTERM"""
+        logger.info("[SCHEDULE] Starting scheduled scraping...")
+        scheduler = AsyncScheduler(max_workers=1)
+        scheduler.add_job(self.url, self.fetch_data, interval, jitter=jitter, max_catch_up=max_catch_up)
         try:
-            with open(file_path, 'w', encoding='utf-8') as file:
-                file.write(data)
-            print(f"[SAVE] ✓ Data successfully saved to {file_path}")
-        except Exception as e:
-            print(f"[ERROR] Failed to save file: {e}")
+            scheduler.run_forever()
+        finally:
+            logger.info("[SCHEDULE] Stopping scraper...")
+            self.cleanup()
+
+
+class MultiSourceScraper:
+    """Scrape several sources from one scheduler, sharing a bounded browser pool"""
+
+    def __init__(self, sources, workers=2, interval=3600, jitter=0, max_catch_up=1, lifecycle=None, **scraper_options):
+        self.workers = workers
+        self.driver_pool = DriverPool(create_driver, size=workers, lifecycle=lifecycle or DriverLifecycle())
+        self.sources = []
+        for source in sources:
+            source = source if isinstance(source, dict) else {'url': source}
+            scraper = BackgroundURLScraper(source['url'], driver_pool=self.driver_pool, **scraper_options)
+            self.sources.append((scraper, source_timing(source, interval=interval, jitter=jitter, max_catch_up=max_catch_up)))
+
+    @property
+    def scrapers(self):
+        return [scraper for scraper, _ in self.sources]
+
+    def fetch_all(self):
+        """Fetch every source once, at most `workers` at a time"""
+        logger.info(f"[MULTI] Fetching {len(self.sources)} sources with {self.workers} workers...")
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for scraper in self.scrapers:
+                executor.submit(scraper.fetch_data)
+        logger.info("[MULTI] ✓ All sources fetched")
 
     def run_schedule(self):
-        """Run scheduled scraping"""
-        print("\n[SCHEDULE] Starting scheduled scraping...")
-        
-        schedule.every(1).hours.do(self.fetch_data)
-        print("[SCHEDULE] Set to run every hour")
-        
-        print("[SCHEDULE] Running initial fetch...")
-        self.fetch_data()
-        
+        """Run every source on its own interval until SIGINT/SIGTERM"""
+        logger.info("[SCHEDULE] Starting scheduled multi-source scraping...")
+        scheduler = AsyncScheduler(max_workers=self.workers)
+        for scraper, timing in self.sources:
+            scheduler.add_job(scraper.url, scraper.fetch_data, **timing)
         try:
-            while True:
-                schedule.run_pending()
-                time.sleep(60)
-        except KeyboardInterrupt:
-            print("\n[SCHEDULE] Stopping scraper...")
+            scheduler.run_forever()
+        finally:
+            logger.info("[SCHEDULE] Stopping scraper...")
             self.cleanup()
 
     def cleanup(self):
-        """Clean up resources"""
+        for scraper in self.scrapers:
+            scraper.cleanup()
+        self.driver_pool.close()
+
+
+class QueueWorker:
+    """Fetch jobs leased from the durable queue (work_queue.py) on `workers` threads sharing a browser pool"""
+
+    def __init__(self, work_queue, workers=1, lifecycle=None, **scraper_options):
+        self.work_queue = work_queue
+        self.workers = workers
+        self.driver_pool = DriverPool(create_driver, size=workers, lifecycle=lifecycle or DriverLifecycle())
+        self.scraper_options = scraper_options
+        self.scrapers = {}  # url -> scraper; a lease means only one thread fetches a URL at a time
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+
+    def scraper_for(self, job):
+        with self.lock:
+            scraper = self.scrapers.get(job.url)
+            if not scraper or scraper.engine != job.engine:
+                options = dict(self.scraper_options, engine=job.engine)
+                scraper = self.scrapers[job.url] = BackgroundURLScraper(job.url, driver_pool=self.driver_pool, **options)
+            return scraper
+
+    def handle(self, job):
+        scraper = self.scraper_for(job)
+        scraper.fetch_data()
+        status = scraper.summary.fields.get('status')
+        if status == 'circuit-open':
+            raise DeferJob(scraper.breaker.remaining(), "circuit open")
+        return status
+
+    def run(self, visibility=900, poll=5):
+        """Work until SIGINT/SIGTERM; jobs in flight are finished first"""
+        logger.info(f"[WORKER] Starting {self.workers} worker(s)...")
+        signal.signal(signal.SIGTERM, lambda *_: self.stop_event.set())
+        owner = default_owner()
+        threads = [
+            threading.Thread(target=run_worker, name=f"worker-{number}", args=(self.work_queue, self.handle),
+                             kwargs=dict(owner=f"{owner}/{number}", visibility=visibility, poll=poll, stop_event=self.stop_event))
+            for number in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
         try:
-            if hasattr(self, 'driver'):
-                self.driver.quit()
-                print("[CLEANUP] ✓ Browser closed successfully")
-        except Exception as e:
-            print(f"[ERROR] Cleanup failed: {e}")
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            logger.info("[WORKER] Stopping after the current jobs...")
+            self.stop_event.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            self.cleanup()
+
+    def cleanup(self):
+        for scraper in self.scrapers.values():
+            scraper.cleanup()
+        self.driver_pool.close()
+        self.work_queue.close()
+
+
+def load_urls(config_path):
+    """
+    Read sources from a JSON list, a {"urls": [...]} object or a plain text file (one per line).
+    JSON entries are URLs or objects like {"url": ..., "interval_minutes": 30, "jitter": 60, "max_catch_up": 1}.
+    """
+    with open(config_path, 'r', encoding='utf-8') as file:
+        raw = file.read()
+    try:
+        config = json.loads(raw)
+    except ValueError:
+        return [line.strip() for line in raw.splitlines() if line.strip() and not line.startswith('#')]
+    return config.get('urls', []) if isinstance(config, dict) else list(config)
+
+
+def source_timing(source, interval, jitter, max_catch_up):
+    """Scheduler settings (interval in seconds) for one source, falling back to the given defaults"""
+    if 'interval_minutes' in source:
+        interval = source['interval_minutes'] * 60
+    return dict(interval=interval, jitter=source.get('jitter', jitter), max_catch_up=max(0, source.get('max_catch_up', max_catch_up)))
+
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python scraper.py <url>")
+    parser = argparse.ArgumentParser(description="Scrape one or more URLs on a schedule in the background")
+    parser.add_argument('urls', nargs='*', help="URL(s) to scrape, optionally followed by the engine (auto|http|selenium)")
+    parser.add_argument('--config', help="File listing the URLs to scrape")
+    parser.add_argument('--workers', type=int, default=2, help="Concurrent fetches (and browser sessions) in multi-source mode")
+    parser.add_argument('--full', action='store_true', help="Rescrape the whole age window instead of stopping at items already saved")
+    parser.add_argument('--parser', default='lxml', choices=sorted(PARSER_BACKENDS), help="HTML parser backend")
+    parser.add_argument('--storage', default='snapshot', choices=['snapshot', 'ndjson', 'both'], help="Hourly JSON snapshots, the deduplicated NDJSON item store, or both")
+    parser.add_argument('--no-index', action='store_true', help="Do not update the full-text search index (fetch-data/.index)")
+    parser.add_argument('--compression', default='none', choices=sorted(COMPRESSION_SUFFIXES), help="Compress hourly snapshots (.txt.gz/.txt.zst); the dashboard only reads plain .txt")
+    parser.add_argument('--no-metrics', action='store_true', help="Do not export per-run timings to fetch-data/.metrics")
+    parser.add_argument('--interval-minutes', '--interval', dest='interval_minutes', type=float, default=60, help="Minutes between runs (per-source \"interval_minutes\" in --config takes precedence)")
+    parser.add_argument('--jitter', type=float, default=0, help="Random delay of up to this many seconds added to each run")
+    parser.add_argument('--catch-up', type=int, default=1, help="Missed runs to replay after the machine was asleep (0: only run the next one)")
+    parser.add_argument('--recycle-after', type=int, default=50, help="Restart a browser session after this many fetches (0: never)")
+    parser.add_argument('--max-browser-mb', type=int, default=1024, help="Restart a browser session once Chrome uses more memory than this (0: no limit)")
+    parser.add_argument('--browser-profiles', help="JSON file with per-domain Chrome settings (blocked resources, load strategy, ready selector)")
+    parser.add_argument('--retries', type=int, default=3, help="Attempts per page load or HTTP request, with exponential backoff between them")
+    parser.add_argument('--ignore-circuit', action='store_true', help="Fetch even while a domain's circuit breaker is open after repeated failures")
+    parser.add_argument('--worker', action='store_true', help="Fetch jobs from the durable queue instead of a schedule (enqueue with work_queue.py)")
+    parser.add_argument('--queue', default=QUEUE_PATH, help="SQLite queue used by --worker")
+    parser.add_argument('--visibility', type=float, default=900, help="Seconds a leased job stays hidden from other workers before it is handed out again")
+    add_logging_arguments(parser, log_file="scraper.log")
+    args = parser.parse_args()
+    setup_logging(args.log_level, args.quiet, args.log_file)
+    if args.browser_profiles:
+        load_profiles(args.browser_profiles)
+
+    urls = list(args.urls)
+    engine = 'auto'
+    if urls and urls[-1] in ('auto', 'http', 'selenium'):
+        engine = urls.pop()
+    if args.config:
+        urls.extend(load_urls(args.config))
+
+    if args.worker:
+        lifecycle = DriverLifecycle(max_uses=args.recycle_after, max_rss_mb=args.max_browser_mb)
+        worker = QueueWorker(WorkQueue(args.queue), workers=max(1, args.workers), lifecycle=lifecycle, incremental=not args.full, parser_backend=args.parser, storage=args.storage, index=not args.no_index, compression=args.compression, metrics=not args.no_metrics, policy=FetchPolicy(attempts=max(1, args.retries), use_breaker=not args.ignore_circuit))
+        worker.run(visibility=args.visibility)
+        sys.exit(0)
+
+    if not urls:
+        print("Usage: python scraper.py <url> [<url> ...] [auto|http|selenium] [--config FILE] [--workers N] [--interval-minutes N]")
         sys.exit(1)
 
-    site_url = sys.argv[1]
-    print(f"\nStarting scraper with URL: {site_url}")
+    sources = [source if isinstance(source, dict) else {'url': source} for source in urls]
+    timing = dict(interval=args.interval_minutes * 60, jitter=args.jitter, max_catch_up=max(0, args.catch_up))
+    logger.info(f"Starting scraper with URL(s): {', '.join(source['url'] for source in sources)} (engine: {engine})")
     
     try:
-        scraper = BackgroundURLScraper(site_url)
-        scraper.run_schedule()
+        lifecycle = DriverLifecycle(max_uses=args.recycle_after, max_rss_mb=args.max_browser_mb)
+        scraper_options = dict(engine=engine, incremental=not args.full, parser_backend=args.parser, storage=args.storage, index=not args.no_index, compression=args.compression, metrics=not args.no_metrics, lifecycle=lifecycle, policy=FetchPolicy(attempts=max(1, args.retries), use_breaker=not args.ignore_circuit))
+        if len(sources) == 1:
+            scraper = BackgroundURLScraper(sources[0]['url'], **scraper_options)
+            scraper.run_schedule(**source_timing(sources[0], **timing))
+        else:
+            scraper = MultiSourceScraper(sources, workers=max(1, args.workers), **timing, **scraper_options)
+            scraper.run_schedule()
     except KeyboardInterrupt:
-        print("\nScraper stopped by user")
+        logger.info("Scraper stopped by user")
     except Exception as e:
-        print(f"Fatal error: {e}")
\ No newline at end of file
+        logger.error(f"Fatal error: {e}")
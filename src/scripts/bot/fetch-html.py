@@ -3,31 +3,27 @@ import os
 import sys
 import time
 import json
-from bs4 import BeautifulSoup
+import argparse
 
 from urllib.parse import urlparse
 from datetime import datetime
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait  # Import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC  # Import Expected Conditions
 from selenium.webdriver.common.action_chains import ActionChains
+from concurrent.futures import ThreadPoolExecutor
+
+from driver_pool import DriverPool, get_driver_path
+from stream_parser import parse_items
+from relative_time import normalize_records
 import logging
 logging.basicConfig(level=logging.DEBUG)
 
 MAX_DAY = 2
 MAX_HOUR = 48
 
-# Check if the URL is provided as a command-line argument
-if len(sys.argv) < 2:
-    print("Usage: python fetch-html.py <url>")
-    sys.exit(1)
-
-# Get the URL from the command-line argument
-site_url = sys.argv[1]
-
 def scroll_to_bottom(driver):
     """
     Scroll to the bottom of the page to load dynamic content.
@@ -42,16 +38,22 @@ def scroll_to_bottom(driver):
             break
         last_height = new_height
 
-def fetch_html_with_selenium(site_url):
-    """
-    Fetch the HTML content using Selenium for JavaScript-rendered content.
-    """
+def create_driver():
+    """Start a Chrome session"""
     options = webdriver.ChromeOptions()
-    
+
     # Add the argument to disable the search engine choice popup
     options.add_argument("--disable-search-engine-choice-screen")
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    return webdriver.Chrome(service=Service(get_driver_path()), options=options)
+
+def fetch_html_with_selenium(site_url, driver=None):
+    """
+    Fetch the HTML content using Selenium for JavaScript-rendered content.
+    Pass an existing driver to reuse the same browser for several URLs.
+    """
+    if driver is None:
+        driver = create_driver()
 
     # Load the website
     driver.get(site_url)
@@ -123,46 +125,13 @@ def extract_list_content_html_selenium(driver):
     
 
 
-def extract_data_as_json(html_content):
+def extract_data_as_json(html_content, backend='lxml'):
     """
-    Extract the data from the HTML content using BeautifulSoup and return it as a list of dictionaries to be exported as JSON.
+    Extract the data from the HTML content and return it as a JSON string.
+    The parser backend is pluggable; see stream_parser.PARSER_BACKENDS.
     """
     try:
-        # Parse the HTML content using BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
-        
-        # Find all the <li> elements within the parsed HTML
-        list_items = soup.find_all('li', class_='te-stream-item')
-        
-        data_list = []
-        
-        for li in list_items:
-            try:
-                # Extract the title
-                title_element = li.select_one('div.te-stream-title-div a.te-stream-title, a.te-stream-title-2')
-                title = title_element.get_text(strip=True) if title_element else ''
-                
-                # Extract the link
-                link = title_element['href'] if title_element else ''
-                
-                # Extract the time (like "13 hours ago" or "2 days ago")
-                time_element = li.find('small')
-                time_text = time_element.get_text(strip=True) if time_element else ''
-                
-                # Extract the content, excluding the time
-                content = li.get_text(separator=' ').split(time_text)[0].strip() if time_text else li.get_text(separator=' ').strip()
-                
-                # Add the structured data to the list
-                data_list.append({
-                    "title": title,
-                    "link": link,
-                    "time": time_text,
-                    "content": content
-                })
-            
-            except Exception as e:
-                print(f"Error processing list item: {e}")
-                continue
+        data_list = normalize_records(parse_items(html_content, backend=backend))
         
         # Return the data as a JSON string
         return json.dumps(data_list, indent=4)
@@ -200,18 +169,48 @@ def export_to_file(data, site_url, file_name):
     except IOError as e:
         print(f"Error writing to file {file_path}: {e}")
 
-if __name__ == "__main__":
-    driver = fetch_html_with_selenium(site_url)
+def scrape_url(driver_pool, site_url):
+    """
+    Fetch, extract and save one URL with a browser borrowed from the pool.
+    Errors are reported per URL, so one failing source does not stop the others.
+    """
+    try:
+        with driver_pool.driver() as driver:
+            fetch_html_with_selenium(site_url, driver)
+
+            # Extract content from the specific list element
+            list_content = extract_data_as_json(extract_list_content_html_selenium(driver))
+
+        if not list_content:
+            print(f"No data extracted from {site_url}")
+            return False
 
-    # Extract content from the specific list element
-    list_content = extract_data_as_json(extract_list_content_html_selenium(driver))
-    
-    if list_content:
         # Save the extracted content to a file
         now = datetime.now()
         date_hour_str = now.strftime("%Y-%m-%d-%H")
         text_file_name = f"{urlparse(site_url).netloc.replace('.', '_')}-{date_hour_str}.txt"
         export_to_file(list_content, site_url, text_file_name)
+        return True
+    except Exception as e:
+        print(f"Failed to fetch {site_url}: {e}")
+        return False
 
-    # Close the browser
-    driver.quit()
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch one or more stream pages once")
+    parser.add_argument('urls', nargs='+', help="URL(s) to fetch")
+    parser.add_argument('--workers', type=int, default=2, help="Pages fetched at the same time (and browsers started at most)")
+    args = parser.parse_args()
+
+    # Browsers are shared through the pool, so memory is bounded by --workers rather than the number of URLs
+    driver_pool = DriverPool(create_driver, size=max(1, min(args.workers, len(args.urls))))
+    try:
+        with ThreadPoolExecutor(max_workers=driver_pool.size) as executor:
+            results = list(executor.map(lambda site_url: scrape_url(driver_pool, site_url), args.urls))
+    finally:
+        # Close the browsers
+        driver_pool.close()
+
+    failed = [site_url for site_url, saved in zip(args.urls, results) if not saved]
+    if failed:
+        print(f"Failed to fetch {len(failed)} of {len(args.urls)} URL(s): {', '.join(failed)}")
+        sys.exit(1)
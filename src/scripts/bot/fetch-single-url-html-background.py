@@ -1,50 +1,48 @@
-import schedule
 import time
 import logging
-from datetime import datetime
-import re
-import os
 import sys
 import json
 import random
+import argparse
+import queue
+import socketserver
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-
-from selenium.webdriver.chrome.options import Options
-
-
-# Configure logging with timestamp
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(message)s',
-    handlers=[
-        logging.FileHandler("scraper.log"),
-        logging.StreamHandler()
-    ]
-)
-
-class BackgroundURLScraper:
-    def __init__(self, url):
-        print(f"\n{'='*50}")
-        print(f"Initializing scraper for URL: {url}")
-        print(f"{'='*50}\n")
-        self.url = url
-        self.MAX_DAY = 2
-        self.MAX_HOUR = 48
-        self.setup_driver()
+
+from base_scraper import BaseScraper
+from log_setup import add_logging_arguments, setup_logging
+from stream_parser import PARSER_BACKENDS
+from snapshot_io import COMPRESSION_SUFFIXES
+from scrape_state import domain_from_url
+from driver_pool import DriverLifecycle, get_driver_path
+from browser_profile import apply_options, get_profile, load_profiles
+from fetch_policy import FetchPolicy
+
+
+logger = logging.getLogger(__name__)
+
+class BackgroundURLScraper(BaseScraper):
+    OK = "[SUCCESS]"
+    SCROLL_PAUSE = (0.3, 0.8)  # short randomized pauses keep some human-like pacing without fixed multi-second sleeps
+
+    def __init__(self, url, engine='auto', extraction='single-pass', incremental=True, parser_backend='lxml', storage='snapshot', index=True, compression='none', metrics=True, lifecycle=None, policy=None, sinks=()):
+        super().__init__(url, engine=engine, extraction=extraction, incremental=incremental, parser_backend=parser_backend, storage=storage, index=index, compression=compression, metrics=metrics, lifecycle=lifecycle, policy=policy, sinks=sinks)
+        self.last_saved_path = None
+        if self.engine == 'selenium':
+            self.setup_driver()
+
+    @property
+    def browser_profile(self):
+        """Blocked resources, load strategy and ready selector for the current URL (daemon scrapers change URL)"""
+        return get_profile(domain_from_url(self.url) if self.url else None)
         
     def setup_driver(self):
         """Configure headless browser with stealth settings"""
         try:
-            print("\n[SETUP] Configuring Chrome options...")
+            logger.info("[SETUP] Configuring Chrome options...")
             options = webdriver.ChromeOptions()
             
             # Stealth settings
@@ -67,10 +65,11 @@ class BackgroundURLScraper:
             options.add_argument('--lang=en-US,en')
             options.add_argument('--disable-dev-shm-usage')
             options.add_argument('--profile-directory=Default')
-            options.add_argument('--remote-debugging-port=9222')
+            # No fixed --remote-debugging-port: chromedriver picks a free one, so runs can overlap
+            apply_options(options, self.browser_profile)
             
-            print("[SETUP] Initializing Chrome driver...")
-            service = Service(ChromeDriverManager().install())
+            logger.info("[SETUP] Initializing Chrome driver...")
+            service = Service(get_driver_path())
             self.driver = webdriver.Chrome(service=service, options=options)
             
             # Additional stealth script
@@ -81,326 +80,226 @@ class BackgroundURLScraper:
             # Remove webdriver flag
             self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
             
-            print("[SETUP] [SUCCESS] Browser initialized successfully in stealth mode")
+            logger.info("[SETUP] [SUCCESS] Browser initialized successfully in stealth mode")
         except Exception as e:
-            print(f"[ERROR] Browser initialization failed: {str(e)}")
+            logger.error(f"[ERROR] Browser initialization failed: {str(e)}")
             raise
 
-    def fetch_data(self):
-        """Main fetch operation with additional stealth measures"""
-        try:
-            print(f"\n{'='*50}")
-            print(f"Starting fetch operation at {datetime.now()}")
-            print(f"{'='*50}")
-            
-            print(f"\n[FETCH] Loading URL: {self.url}")
-            self.driver.get(self.url)
-            
-            # Add random delay to mimic human behavior
-            time.sleep(random.uniform(2, 4))
-            
-            # Check for verification page
-            if "Human Verification" in self.driver.title:
-                print("[FETCH] Detected verification page, attempting bypass...")
-                try:
-                    # Wait for page to fully load
-                    time.sleep(3)
-                    # You might need to add specific handling for the verification page here
-                    print("[FETCH] Attempting to navigate verification...")
-                except Exception as e:
-                    print(f"[ERROR] Failed to bypass verification: {e}")
-                    return False
-            
-            print("[FETCH] Scrolling page to load dynamic content...")
-            self.scroll_to_bottom()
-            
-            print("[FETCH] Extracting content...")
-            content = self.extract_list_content()
-            
-            if content:
-                print("[FETCH] Converting content to JSON...")
-                json_data = self.extract_data_as_json(content)
-                
-                if json_data:
-                    print("[FETCH] Saving data to file...")
-                    self.save_to_file(json_data)
-                    print("[FETCH] [SUCCESS] Fetch operation completed successfully")
-                    return True
-                else:
-                    print("[ERROR] Failed to convert content to JSON")
-            else:
-                print("[ERROR] No content extracted")
-                
-            return False
-                
-        except Exception as e:
-            print(f"[ERROR] Fetch operation failed: {e}")
-            return False
-            
+    def load_page(self):
+        """Load the page like BaseScraper, then pause briefly"""
+        super().load_page()
+        # Short random delay to mimic human behavior (the stream is already there)
+        time.sleep(random.uniform(0.5, 1.5))
 
     def scroll_to_bottom(self):
-        """Scroll with human-like behavior"""
-        try:
-            scroll_count = 0
-            last_height = self.driver.execute_script("return document.body.scrollHeight")
-            
-            while True:
-                scroll_count += 1
-                print(f"[SCROLL] Scroll attempt #{scroll_count}")
-                
-                # Random scroll amount
-                scroll_amount = random.uniform(0.7, 1.0)
-                self.driver.execute_script(f"window.scrollTo(0, document.body.scrollHeight * {scroll_amount});")
-                
-                # Random delay between scrolls
-                time.sleep(random.uniform(1, 3))
-                
-                new_height = self.driver.execute_script("return document.body.scrollHeight")
-                if new_height == last_height:
-                    print("[SCROLL] [SUCCESS] Reached bottom of page")
-                    break
-                    
-                print(f"[SCROLL] New content loaded (Height: {new_height}px)")
-                last_height = new_height
-                
-                # Add random pause between scrolls
-                time.sleep(random.uniform(0.5, 1.5))
-        except Exception as e:
-            print(f"[ERROR] Scroll operation failed: {e}")
-
-    def extract_list_content(self):
-        """Extract HTML content"""
+        """Scroll like BaseScraper; a failed scroll still lets the loaded items be extracted"""
         try:
-            print("[EXTRACT] Analyzing page structure...")
-            # First, let's print the page source to debug
-            page_source = self.driver.page_source
-            print("[EXTRACT] Page title:", self.driver.title)
-            
-            # Try different possible selectors
-            possible_selectors = [
-                ('//*[@id="stream"]', "Stream ID"),
-                ('//*[@class="stream"]', "Stream Class"),
-                ('//ul[contains(@class, "stream")]', "Stream UL"),
-                ('//div[contains(@class, "stream")]', "Stream DIV")
-            ]
-            
-            ul_element = None
-            used_selector = None
-            
-            for selector, selector_name in possible_selectors:
-                print(f"[EXTRACT] Trying selector: {selector_name}")
-                try:
-                    ul_element = WebDriverWait(self.driver, 5).until(
-                        EC.presence_of_element_located((By.XPATH, selector))
-                    )
-                    if ul_element:
-                        print(f"[EXTRACT] [SUCCESS] Found element using {selector_name}")
-                        used_selector = selector_name
-                        break
-                except Exception as e:
-                    print(f"[EXTRACT] {selector_name} not found, trying next...")
-            
-            if not ul_element:
-                print("[EXTRACT] Attempting to find any list items on page...")
-                try:
-                    # Try to find any list items
-                    list_items = self.driver.find_elements(By.TAG_NAME, 'li')
-                    if list_items:
-                        print(f"[EXTRACT] Found {len(list_items)} general list items")
-                        ul_element = list_items[0].find_element(By.XPATH, '..')
-                except Exception as e:
-                    print("[EXTRACT] No list items found")
-            
-            if ul_element:
-                print("[EXTRACT] Finding list items...")
-                list_items = ul_element.find_elements(By.TAG_NAME, 'li')
-                print(f"[EXTRACT] Found {len(list_items)} items")
-                
-                # Debug the first item if available
-                if list_items:
-                    print("[EXTRACT] First item HTML:")
-                    print(list_items[0].get_attribute('outerHTML'))
-                
-                valid_data = []
-                processed_count = 0
-
-                for item in list_items:
-                    try:
-                        processed_count += 1
-                        print(f"\n[PROCESS] Processing item {processed_count}/{len(list_items)}")
-                        
-                        # Try different time element selectors
-                        time_selectors = [
-                            ('small', 'Small tag'),
-                            ('span[contains(@class, "time")]', 'Time span'),
-                            ('div[contains(@class, "time")]', 'Time div'),
-                            ('*[contains(text(), "ago")]', 'Text containing ago')
-                        ]
-                        
-                        time_text = None
-                        for selector, selector_name in time_selectors:
-                            try:
-                                time_element = item.find_element(By.CSS_SELECTOR, selector)
-                                time_text = time_element.text.strip()
-                                print(f"[PROCESS] Time found using {selector_name}: {time_text}")
-                                break
-                            except:
-                                continue
-                        
-                        if not time_text:
-                            print("[PROCESS] ⚠ No time element found, skipping age check")
-                            valid_data.append(item.get_attribute('outerHTML'))
-                            continue
-
-                        hours_match = re.search(r'(\d+)\s+hours?\s+ago', time_text)
-                        days_match = re.search(r'(\d+)\s+days?\s+ago', time_text)
-
-                        if hours_match:
-                            hours_ago = int(hours_match.group(1))
-                            if hours_ago > self.MAX_HOUR:
-                                print(f"[PROCESS] ⚠ Data too old ({hours_ago} hours), stopping")
-                                break
-                        elif days_match:
-                            days_ago = int(days_match.group(1))
-                            if days_ago >= self.MAX_DAY:
-                                print(f"[PROCESS] ⚠ Data too old ({days_ago} days), stopping")
-                                break
-
-                        valid_data.append(item.get_attribute('outerHTML'))
-                        print("[PROCESS] [SUCCESS] Item processed successfully")
-
-                    except Exception as e:
-                        print(f"[ERROR] Failed to process item: {str(e)}")
-                        continue
-
-                print(f"\n[EXTRACT] [SUCCESS] Successfully extracted {len(valid_data)} valid items")
-                return '\n\n\n'.join(valid_data)
-            else:
-                print("[ERROR] No suitable container element found")
-                return None
-
+            super().scroll_to_bottom()
         except Exception as e:
-            print(f"[ERROR] Content extraction failed: {str(e)}")
-            # Print page source for debugging
-            print("\n[DEBUG] Page source:")
-            print(self.driver.page_source[:1000] + "...")  # Print first 1000 chars
-            return None
-
-    def extract_data_as_json(self, html_content):
-        """Convert to JSON format"""
-        try:
-            print("[JSON] Parsing HTML content...")
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            print("[JSON] Finding stream items...")
-            list_items = soup.find_all('li', class_='te-stream-item')
-            print(f"[JSON] Found {len(list_items)} items to process")
-            
-            data_list = []
-            
-            for i, li in enumerate(list_items, 1):
-                try:
-                    print(f"[JSON] Processing item {i}/{len(list_items)}")
-                    
-                    title_element = li.select_one('div.te-stream-title-div a.te-stream-title, a.te-stream-title-2')
-                    title = title_element.get_text(strip=True) if title_element else ''
-                    link = title_element['href'] if title_element else ''
-                    
-                    time_element = li.find('small')
-                    time_text = time_element.get_text(strip=True) if time_element else ''
-                    
-                    content = li.get_text(separator=' ').split(time_text)[0].strip() if time_text else li.get_text(separator=' ').strip()
-                    
-                    data_list.append({
-                        "title": title,
-                        "link": link,
-                        "time": time_text,
-                        "content": content
-                    })
-                    print(f"[JSON] [SUCCESS] Item {i} processed successfully")
-                
-                except Exception as e:
-                    print(f"[ERROR] Failed to process JSON item {i}: {e}")
-                    continue
-            
-            print(f"[JSON] [SUCCESS] Successfully converted {len(data_list)} items to JSON")
-            return json.dumps(data_list, indent=4)
+            logger.error(f"[ERROR] Scroll operation failed: {e}")
 
-        except Exception as e:
-            print(f"[ERROR] JSON conversion failed: {e}")
-            return None
+    def save_records(self, records):
+        """Save like BaseScraper and remember where, for the daemon's responses"""
+        result = super().save_records(records)
+        if result.saved:
+            self.last_saved_path = result.results.get('snapshot') or (self.item_store.shard_path() if self.item_store else None)
+        return result
 
-    def save_to_file(self, data):
-        """Save data to file"""
-        parsed_url = urlparse(self.url)
-        domain = parsed_url.netloc.replace('.', '_')
-        
-        print(f"[SAVE] Preparing to save data for domain: {domain}")
-        
-        origin = "fetch-data"
-        now = datetime.now()
-        date_str = now.strftime("%Y-%m-%d")
-        hour_str = now.strftime("%H")
-        
-        folder_path = os.path.join(origin, domain, date_str, hour_str)
-        os.makedirs(folder_path, exist_ok=True)
-        
-        file_name = f"{domain}-{now.strftime('%Y-%m-%d-%H')}.txt"
-        file_path = os.path.join(folder_path, file_name)
-        
-        print(f"[SAVE] Saving to: {file_path}")
-        
-        try:
-            with open(file_path, 'w', encoding='utf-8') as file:
-                file.write(data)
-            print(f"[SAVE] [SUCCESS] Data successfully saved to {file_path}")
-        except Exception as e:
-            print(f"[ERROR] Failed to save file: {e}")
+    def fetch_url(self, url):
+        """Fetch another URL while keeping the current browser session"""
+        self.url = url
+        self.last_saved_path = None
+        return self.fetch_data()
 
     def run_once(self):
         """Run single scraping operation"""
-        print("\n[EXECUTE] Starting single scraping operation...")
+        logger.info("[EXECUTE] Starting single scraping operation...")
         try:
             success = self.fetch_data()
             self.cleanup()  # Always cleanup
             return success
         except Exception as e:
-            print(f"[ERROR] Scraping operation failed: {e}")
+            logger.error(f"[ERROR] Scraping operation failed: {e}")
             self.cleanup()  # Always cleanup
             return False
-    
 
-    def cleanup(self):
-        """Clean up resources"""
+
+class ScraperDaemon:
+    """Serve fetch requests from a pool of warm scrapers"""
+
+    def __init__(self, workers=1, engine='auto', **scraper_options):
+        self.workers = workers
+        self.engine = engine
+        self.scrapers = []
+        self.pool = queue.Queue()
+        self.output_lock = threading.Lock()
+
+        logger.info(f"[DAEMON] Warming {workers} scraper(s) (engine: {engine})...")
+        for _ in range(workers):
+            scraper = BackgroundURLScraper(None, engine=engine, **scraper_options)
+            if engine != 'http' and not scraper.driver:
+                scraper.setup_driver()
+            self.scrapers.append(scraper)
+            self.pool.put(scraper)
+        logger.info("[DAEMON] [SUCCESS] Scrapers ready")
+
+    def handle(self, line):
+        """Run one JSON request ({"url": ..., "id": ...}) and return the response dict"""
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as e:
+            return {"status": "error", "message": f"Invalid JSON: {e}"}
+
+        if isinstance(request, str):
+            request = {"url": request}
+        if not isinstance(request, dict) or not request.get('url'):
+            return {"status": "error", "message": "URL is required"}
+
+        url = request['url']
+        scraper = self.pool.get()
+        started = time.time()
         try:
-            if hasattr(self, 'driver'):
-                self.driver.quit()
-                print("[CLEANUP] [SUCCESS] Browser closed successfully")
+            success = scraper.fetch_url(url)
         except Exception as e:
-            print(f"[ERROR] Cleanup failed: {e}")
+            logger.error(f"[ERROR] Daemon fetch failed for {url}: {e}")
+            success = False
+        finally:
+            self.pool.put(scraper)
+
+        return {
+            "id": request.get('id'),
+            "url": url,
+            "status": "success" if success else "error",
+            "file": scraper.last_saved_path if success else None,
+            "reason": None if success else scraper.summary.fields.get('status'),
+            "elapsed": round(time.time() - started, 3)
+        }
+
+    def serve_stdin(self):
+        """Read JSON-lines requests from stdin and write responses to stdout"""
+        logger.info("[DAEMON] Reading requests from stdin...")
+
+        def respond(line):
+            response = self.handle(line)
+            with self.output_lock:
+                sys.__stdout__.write(json.dumps(response) + '\n')
+                sys.__stdout__.flush()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for line in sys.stdin:
+                line = line.strip()
+                if line:
+                    executor.submit(respond, line)
+
+    def serve_socket(self, port):
+        """Accept JSON-lines requests on a local TCP socket"""
+        daemon = self
+
+        class RequestHandler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for raw_line in self.rfile:
+                    line = raw_line.decode('utf-8').strip()
+                    if not line:
+                        continue
+                    response = daemon.handle(line)
+                    self.wfile.write((json.dumps(response) + '\n').encode('utf-8'))
+                    self.wfile.flush()
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        with socketserver.ThreadingTCPServer(('127.0.0.1', port), RequestHandler) as server:
+            server.daemon_threads = True
+            logger.info(f"[DAEMON] Listening on 127.0.0.1:{port}")
+            server.serve_forever()
+
+    def shutdown(self):
+        """Close every pooled browser"""
+        logger.info("[DAEMON] Shutting down...")
+        for scraper in self.scrapers:
+            scraper.cleanup()
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Fetch a single URL, or serve fetch requests from warm browsers")
+    parser.add_argument('url', nargs='?', help="URL to fetch once")
+    parser.add_argument('engine', nargs='?', default='auto', choices=['auto', 'http', 'selenium'])
+    parser.add_argument('--daemon', action='store_true', help="Keep browsers warm and read JSON-lines requests")
+    parser.add_argument('--port', type=int, help="Serve requests on 127.0.0.1:<port> instead of stdin")
+    parser.add_argument('--workers', type=int, default=1, help="Number of warm browser sessions")
+    parser.add_argument('--full', action='store_true', help="Rescrape the whole age window instead of stopping at items already saved")
+    parser.add_argument('--parser', default='lxml', choices=sorted(PARSER_BACKENDS), help="HTML parser backend")
+    parser.add_argument('--storage', default='snapshot', choices=['snapshot', 'ndjson', 'both'], help="Hourly JSON snapshots, the deduplicated NDJSON item store, or both")
+    parser.add_argument('--no-index', action='store_true', help="Do not update the full-text search index (fetch-data/.index)")
+    parser.add_argument('--compression', default='none', choices=sorted(COMPRESSION_SUFFIXES), help="Compress hourly snapshots (.txt.gz/.txt.zst); the dashboard only reads plain .txt")
+    parser.add_argument('--no-metrics', action='store_true', help="Do not export per-run timings to fetch-data/.metrics")
+    parser.add_argument('--recycle-after', type=int, default=50, help="Restart a warm browser after this many fetches (0: never)")
+    parser.add_argument('--max-browser-mb', type=int, default=1024, help="Restart a warm browser once Chrome uses more memory than this (0: no limit)")
+    parser.add_argument('--browser-profiles', help="JSON file with per-domain Chrome settings (blocked resources, load strategy, ready selector)")
+    parser.add_argument('--retries', type=int, default=3, help="Attempts per page load or HTTP request, with exponential backoff between them")
+    parser.add_argument('--ignore-circuit', action='store_true', help="Fetch even while a domain's circuit breaker is open after repeated failures")
+    add_logging_arguments(parser, log_file="scraper.log")
+    return parser.parse_args(argv)
+
+
+def fetch_policy(args):
+    return FetchPolicy(attempts=max(1, args.retries), use_breaker=not args.ignore_circuit)
+
+
+def run_daemon(args):
+    # stdout carries the JSON responses in stdin mode, so route progress output to stderr
+    sys.stdout = sys.stderr
+    setup_logging(args.log_level, args.quiet, args.log_file, stream=sys.stderr)
+    if args.browser_profiles:
+        load_profiles(args.browser_profiles)
+    # With --daemon there is no URL argument, so a single positional is the engine
+    engine = args.url or args.engine
+    if engine not in ('auto', 'http', 'selenium'):
+        logger.error(f"[ERROR] Unknown engine: {engine}")
+        sys.exit(1)
+    daemon = ScraperDaemon(workers=max(1, args.workers), engine=engine, incremental=not args.full, parser_backend=args.parser, storage=args.storage, index=not args.no_index, compression=args.compression, metrics=not args.no_metrics, lifecycle=DriverLifecycle(max_uses=args.recycle_after, max_rss_mb=args.max_browser_mb), policy=fetch_policy(args))
+    try:
+        if args.port:
+            daemon.serve_socket(args.port)
+        else:
+            daemon.serve_stdin()
+    except KeyboardInterrupt:
+        logger.info("[DAEMON] Stopped by user")
+    finally:
+        daemon.shutdown()
+
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python scraper.py <url>")
+    args = parse_args(sys.argv[1:])
+
+    if args.daemon:
+        run_daemon(args)
+        sys.exit(0)
+
+    setup_logging(args.log_level, args.quiet, args.log_file)
+    if args.browser_profiles:
+        load_profiles(args.browser_profiles)
+    if not args.url:
+        print("Usage: python scraper.py <url> [auto|http|selenium]")
+        print("       python scraper.py --daemon [--port PORT] [--workers N] [auto|http|selenium]")
         sys.exit(1)
 
-    site_url = sys.argv[1]
-    print(f"\nStarting scraper with URL: {site_url}")
+    site_url = args.url
+    engine = args.engine
+    logger.info(f"Starting scraper with URL: {site_url} (engine: {engine})")
     
     try:
-        scraper = BackgroundURLScraper(site_url)
+        scraper = BackgroundURLScraper(site_url, engine=engine, incremental=not args.full, parser_backend=args.parser, storage=args.storage, index=not args.no_index, compression=args.compression, metrics=not args.no_metrics, policy=fetch_policy(args))
         success = scraper.run_once()  # Run once instead of scheduling
         
         if success:
-            print("\n[SUCCESS] Scraping completed successfully")
+            logger.info("[SUCCESS] Scraping completed successfully")
             sys.exit(0)  # Exit with success code
         else:
-            print("\n[FAILURE] Scraping failed")
+            logger.error("[FAILURE] Scraping failed")
             sys.exit(1)  # Exit with error code
             
     except KeyboardInterrupt:
-        print("\nScraper stopped by user")
+        logger.info("Scraper stopped by user")
         sys.exit(1)
     except Exception as e:
-        print(f"Fatal error: {e}")
+        logger.error(f"Fatal error: {e}")
         sys.exit(1)
@@ -0,0 +1,151 @@
+import logging
+import random
+import time
+from datetime import datetime
+
+from http_fetcher import VERIFICATION_MARKER
+from scrape_state import STATE_DIR, load_state, update_state
+
+
+logger = logging.getLogger(__name__)
+
+
+class VerificationPageError(Exception):
+    """The site answered with a bot-check interstitial instead of the stream"""
+
+
+def backoff_delay(attempt, base_delay=2, max_delay=30):
+    """'Full jitter' exponential backoff: uniform in [0, min(max_delay, base_delay * 2**attempt)]"""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+
+def retry_call(func, attempts=3, base_delay=2, max_delay=30, retry_if=None, give_up_on=(VerificationPageError,), label='request', sleep=time.sleep):
+    """
+    Call func until it succeeds or attempts run out, backing off between tries. Exceptions are
+    retried except give_up_on ones; a result is retried while retry_if(result) is true, and the
+    last one is returned as is.
+    """
+    for attempt in range(attempts):
+        last = attempt + 1 >= attempts
+        try:
+            result = func()
+        except give_up_on:
+            raise
+        except Exception as e:
+            if last:
+                raise
+            problem = e
+        else:
+            if last or not (retry_if and retry_if(result)):
+                return result
+            problem = retry_if(result)
+        delay = backoff_delay(attempt, base_delay, max_delay)
+        logger.warning(f"[RETRY] {label} failed ({problem}); attempt {attempt + 2}/{attempts} in {delay:.1f}s")
+        sleep(delay)
+
+
+def wait_out_verification(driver, timeout=5, poll=0.5):
+    """Give a verification interstitial a few seconds to clear itself; raise VerificationPageError if it does not"""
+    deadline = time.monotonic() + timeout
+    while VERIFICATION_MARKER in (driver.title or ''):
+        if time.monotonic() >= deadline:
+            raise VerificationPageError("verification page did not clear")
+        time.sleep(poll)
+
+
+class CircuitBreaker:
+    """
+    Per-domain breaker kept in the 'circuit' section of the domain state, so separate
+    processes (hourly runs, re-invoked single-URL fetches) share it.
+
+    closed: fetch normally. After failure_threshold consecutive failures, or any verification
+    page, it opens for a cooldown that doubles with each re-open (capped at max_cooldown).
+    Once the cooldown has passed one trial fetch is let through (half-open): success closes
+    the breaker, failure re-opens it.
+    """
+
+    def __init__(self, domain, failure_threshold=3, cooldown=300, max_cooldown=6 * 3600, verification_cooldown=1800, state_dir=STATE_DIR):
+        self.domain = domain
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.verification_cooldown = verification_cooldown
+        self.state_dir = state_dir
+
+        section = load_state(domain, state_dir).get('circuit', {})
+        self.state = section.get('state', 'closed')
+        self.failures = section.get('failures', 0)
+        self.opens = section.get('opens', 0)  # re-opens since the last success, for the doubling
+        self.open_until = section.get('open_until', 0)
+        self.reason = section.get('reason')
+
+    def allow(self, now=None):
+        """True if a fetch may be attempted now; an expired open breaker goes half-open"""
+        now = now or time.time()
+        if self.state == 'open':
+            if now < self.open_until:
+                return False
+            self.state = 'half-open'
+            logger.info(f"[CIRCUIT] {self.domain}: cooldown over, trying one fetch")
+        return True
+
+    def remaining(self, now=None):
+        return max(0.0, self.open_until - (now or time.time())) if self.state == 'open' else 0.0
+
+    def record_success(self):
+        if self.state == 'closed' and not self.failures:
+            return
+        if self.state != 'closed':
+            logger.info(f"[CIRCUIT] {self.domain}: recovered, closing")
+        self.state, self.failures, self.opens, self.reason = 'closed', 0, 0, None
+        self.save()
+
+    def record_failure(self, reason, verification=False):
+        self.failures += 1
+        self.reason = reason
+        if verification:
+            self.trip(self.verification_cooldown * 2 ** self.opens)
+        elif self.state == 'half-open' or self.failures >= self.failure_threshold:
+            self.trip(self.cooldown * 2 ** self.opens)
+        self.save()
+
+    def trip(self, cooldown):
+        cooldown = min(self.max_cooldown, cooldown) * random.uniform(0.8, 1.2)
+        self.state = 'open'
+        self.opens += 1
+        self.open_until = time.time() + cooldown
+        logger.warning(f"[CIRCUIT] {self.domain}: opening for {cooldown / 60:.0f} min ({self.reason})")
+
+    def save(self):
+        update_state(self.domain, 'circuit', {
+            "state": self.state,
+            "failures": self.failures,
+            "opens": self.opens,
+            "open_until": self.open_until,
+            "reason": self.reason,
+            "updated_at": datetime.now().isoformat()
+        }, self.state_dir)
+
+
+class FetchPolicy:
+    """Retry and circuit-breaker settings shared by the scrapers"""
+
+    def __init__(self, attempts=3, base_delay=2, max_delay=30, failure_threshold=3, cooldown=300,
+                 max_cooldown=6 * 3600, verification_cooldown=1800, use_breaker=True):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.verification_cooldown = verification_cooldown
+        self.use_breaker = use_breaker  # False: never skip a fetch (failures are still recorded)
+
+    def breaker(self, domain):
+        return CircuitBreaker(
+            domain, failure_threshold=self.failure_threshold, cooldown=self.cooldown,
+            max_cooldown=self.max_cooldown, verification_cooldown=self.verification_cooldown
+        )
+
+    def call(self, func, label='request', retry_if=None):
+        return retry_call(func, attempts=self.attempts, base_delay=self.base_delay, max_delay=self.max_delay, retry_if=retry_if, label=label)
@@ -0,0 +1,129 @@
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from stream_parser import parse_stream
+
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"
+VERIFICATION_MARKER = "Human Verification"
+VERIFICATION_REASON = "verification page detected"
+TRANSIENT_STATUS = (429, 500, 502, 503, 504)  # worth another try after a pause
+META_CHARSET_RE = re.compile(rb'<meta[^>]+charset', re.IGNORECASE)
+
+DEFAULT_HEADERS = {
+    "User-Agent": USER_AGENT,
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Connection": "keep-alive",
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(pool_size=8):
+    """Return the process-wide keep-alive session, creating it on first use"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update(DEFAULT_HEADERS)
+            _session = session
+        return _session
+
+
+def response_html(response):
+    """
+    Page for the parser. With no charset in Content-Type, requests would decode it as ISO-8859-1,
+    so the bytes go to lxml when the page has a <meta charset>, and are decoded as UTF-8 otherwise
+    (falling back to the detected encoding).
+    """
+    if 'charset=' in response.headers.get("Content-Type", "").lower():
+        return response.text
+    content = response.content
+    if META_CHARSET_RE.search(content[:2048]):
+        return content
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        response.encoding = response.apparent_encoding
+        return response.text
+
+
+class HttpFetchResult:
+    """Outcome of a plain-HTTP fetch"""
+
+    def __init__(self, records=None, fallback_reason=None, status_code=None, not_modified=False, etag=None, last_modified=None, transient=False):
+        self.records = records or []
+        self.fallback_reason = fallback_reason
+        self.status_code = status_code
+        self.transient = transient  # connection error, rate limit or 5xx: retrying may help
+        self.not_modified = not_modified  # 304: nothing changed since the validators we sent
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def needs_fallback(self):
+        return self.fallback_reason is not None
+
+
+class HttpStreamFetcher:
+    """Fetch server-rendered stream pages without a browser"""
+
+    def __init__(self, max_hour=48, max_day=2, timeout=15):
+        self.max_hour = max_hour
+        self.max_day = max_day
+        self.timeout = timeout
+        self.session = get_session()
+
+    def fetch(self, url, seen_keys=None, etag=None, last_modified=None, container_selectors=None):
+        """
+        Download the page and return its stream records; etag/last_modified make it a conditional request.
+        container_selectors are the domain's (xpath, label) fallbacks (SelectorPlan.container_xpaths()).
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        try:
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+        except requests.RequestException as e:
+            return HttpFetchResult(fallback_reason=f"request failed: {e}", transient=True)
+
+        validators = dict(etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
+        if response.status_code == 304 and headers:
+            return HttpFetchResult(status_code=304, not_modified=True, **validators)
+
+        if response.status_code != 200:
+            return HttpFetchResult(fallback_reason=f"HTTP {response.status_code}", status_code=response.status_code,
+                                   transient=response.status_code in TRANSIENT_STATUS)
+
+        result = self.parse(response_html(response), status_code=response.status_code, seen_keys=seen_keys, container_selectors=container_selectors)
+        result.etag, result.last_modified = validators["etag"], validators["last_modified"]
+        return result
+
+    def parse(self, page_html, status_code=None, seen_keys=None, container_selectors=None):
+        """Locate the stream container and apply the age cutoff and high-water mark"""
+        if not page_html:
+            return HttpFetchResult(fallback_reason="empty response", status_code=status_code)
+
+        page = parse_stream(page_html, max_hour=self.max_hour, max_day=self.max_day, seen_keys=seen_keys, container_selectors=container_selectors)
+
+        if VERIFICATION_MARKER in page.title:
+            return HttpFetchResult(fallback_reason=VERIFICATION_REASON, status_code=status_code)
+
+        if not page.has_container:
+            return HttpFetchResult(fallback_reason="stream container not found", status_code=status_code)
+
+        if not page.records and not page.seen_reached:
+            return HttpFetchResult(fallback_reason="no stream items in server-rendered HTML", status_code=status_code)
+
+        return HttpFetchResult(records=page.records, status_code=status_code)
@@ -0,0 +1,118 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from scrape_state import domain_lock
+from stream_parser import item_key
+
+
+STORE_DIR = os.path.join("fetch-data", ".store")
+
+
+class ItemStore:
+    """
+    Append-only NDJSON store of unique items for one domain.
+
+    Items are appended to monthly shards (items-YYYY-MM.ndjson) keyed by item_key;
+    seen.idx holds one key per line so a new process can skip known items without
+    reading the shards. Appends run under the domain lock, so several scrapers and
+    processes can share a domain's store.
+    """
+
+    def __init__(self, domain, store_dir=STORE_DIR):
+        self.domain = domain
+        self.folder_path = os.path.join(store_dir, domain)
+        self.index_path = os.path.join(self.folder_path, "seen.idx")
+        self.seen_keys = None
+        self.index_offset = 0  # bytes of seen.idx already read into seen_keys
+        self.index_inode = None  # a rebuilt seen.idx is a new file and is read again from the start
+        self.lock = threading.Lock()
+
+    def shard_path(self, when=None):
+        when = when or datetime.now()
+        return os.path.join(self.folder_path, f"items-{when.strftime('%Y-%m')}.ndjson")
+
+    def load_index(self):
+        """
+        Read seen keys from the index, rebuilding it from the shards if it is missing. Later calls
+        only read the keys other writers appended since; call it under the domain lock.
+        """
+        if not os.path.exists(self.index_path) and os.path.isdir(self.folder_path):
+            self.rebuild_index()
+            return self.seen_keys
+
+        try:
+            with open(self.index_path, 'rb') as file:
+                inode = os.fstat(file.fileno()).st_ino
+                if self.seen_keys is None or inode != self.index_inode:
+                    self.seen_keys, self.index_offset, self.index_inode = set(), 0, inode
+                file.seek(self.index_offset)
+                data = file.read()
+        except OSError:
+            self.seen_keys = self.seen_keys if self.seen_keys is not None else set()
+            return self.seen_keys
+
+        self.index_offset += len(data)
+        self.seen_keys.update(line.strip() for line in data.decode('utf-8').splitlines() if line.strip())
+        return self.seen_keys
+
+    def rebuild_index(self):
+        """Recreate seen.idx from the stored items"""
+        self.seen_keys = set(item['key'] for item in self.iter_items())
+        os.makedirs(self.folder_path, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            file.writelines(f"{key}\n" for key in sorted(self.seen_keys))
+        os.replace(tmp_path, self.index_path)
+        stat = os.stat(self.index_path)
+        self.index_offset, self.index_inode = stat.st_size, stat.st_ino
+
+    def append(self, records, fetched_at=None):
+        """Append records not stored yet; returns the number of items added"""
+        fetched_at = int(fetched_at or time.time())
+        with self.lock, domain_lock(self.domain):
+            # Another scraper or process may have stored items since we last looked
+            seen_keys = self.load_index()
+
+            lines = []
+            new_keys = {}
+            for record in records:
+                key = item_key(record)
+                if key in seen_keys or key in new_keys:
+                    continue
+                new_keys[key] = True
+                item = {"key": key, "fetched_at": fetched_at}
+                item.update(record)
+                lines.append(json.dumps(item, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+            if not lines:
+                return 0
+
+            os.makedirs(self.folder_path, exist_ok=True)
+            # Items first, then the index: a crash in between can only cause a duplicate, never a loss
+            with open(self.shard_path(), 'a', encoding='utf-8') as file:
+                file.writelines(lines)
+            with open(self.index_path, 'a', encoding='utf-8') as file:
+                file.writelines(f"{key}\n" for key in new_keys)
+
+            seen_keys.update(new_keys)
+            return len(lines)
+
+    def iter_items(self):
+        """Yield stored items shard by shard (oldest month first)"""
+        if not os.path.isdir(self.folder_path):
+            return
+        for file_name in sorted(os.listdir(self.folder_path)):
+            if not (file_name.startswith("items-") and file_name.endswith(".ndjson")):
+                continue
+            with open(os.path.join(self.folder_path, file_name), 'r', encoding='utf-8') as file:
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue  # torn last line from an interrupted append
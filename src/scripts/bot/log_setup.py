@@ -0,0 +1,183 @@
+import atexit
+import contextvars
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+
+
+CONSOLE_FORMAT = '%(message)s'
+FILE_FORMAT = '%(asctime)s %(levelname)s %(name)s - %(message)s'
+
+_listener = None
+
+
+class SummaryFilter(logging.Filter):
+    """Quiet mode: pass only run summaries and warnings/errors"""
+
+    def filter(self, record):
+        return getattr(record, 'summary', False) or record.levelno >= logging.WARNING
+
+
+def add_logging_arguments(parser, log_file=None):
+    """Add the shared --log-level/--quiet/--log-file flags to an argparse parser"""
+    parser.add_argument('--log-level', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'], help="DEBUG also shows per-item progress")
+    parser.add_argument('--quiet', action='store_true', help="Only log one summary line per run (plus warnings and errors)")
+    parser.add_argument('--log-file', default=log_file, help="Also log to this file, rotated by size")
+
+
+def setup_logging(level='INFO', quiet=False, log_file=None, stream=None, max_bytes=5 * 1024 * 1024, backup_count=3):
+    """
+    Route all logging through a queue so callers never block on console or disk I/O.
+    A background listener writes to `stream` (default stdout) and, optionally, to a
+    size-rotated log file. Calling it again replaces the previous configuration.
+    """
+    global _listener
+    stop_logging()
+
+    filters = [SummaryFilter()] if quiet else []
+
+    console = logging.StreamHandler(stream or sys.stdout)
+    console.setFormatter(logging.Formatter(CONSOLE_FORMAT))
+    handlers = [console]
+
+    if log_file:
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8', delay=True
+        )
+        file_handler.setFormatter(logging.Formatter(FILE_FORMAT))
+        handlers.append(file_handler)
+
+    for handler in handlers:
+        for log_filter in filters:
+            handler.addFilter(log_filter)
+
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return root
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
+_current_summary = contextvars.ContextVar('current_summary', default=None)
+
+
+class RunSummary:
+    """Per-phase timings and counters for one run, logged as a single line"""
+
+    def __init__(self, logger, tag, **fields):
+        self.logger = logger
+        self.tag = tag
+        self.fields = dict(fields)
+        self.timings = defaultdict(float)
+        self.durations = defaultdict(list)  # every timed call, for latency histograms
+        self.counts = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.errors[name] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self.timings[name] += elapsed
+            self.durations[name].append(elapsed)
+
+    def timed(self, name, iterable):
+        """Yield from iterable, charging the time spent producing items to phase `name` as one call"""
+        iterator = iter(iterable)
+        elapsed = 0.0
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                except Exception:
+                    self.errors[name] += 1
+                    raise
+                finally:
+                    elapsed += time.perf_counter() - started
+                yield item
+        finally:
+            self.charge(name, elapsed)
+
+    def charge(self, name, seconds):
+        """Add time measured elsewhere to phase `name` as one call"""
+        self.timings[name] += seconds
+        self.durations[name].append(seconds)
+
+    @contextmanager
+    def activate(self):
+        """Make this the summary that track() reports to"""
+        token = _current_summary.set(self)
+        try:
+            yield self
+        finally:
+            _current_summary.reset(token)
+
+    def count(self, name, amount=1):
+        self.counts[name] += amount
+
+    def error(self, name):
+        self.errors[name] += 1
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def to_dict(self):
+        return {
+            "tag": self.tag,
+            "started_at": self.started_at,
+            "elapsed": round(self.elapsed, 4),
+            "fields": self.fields,
+            "counts": dict(self.counts),
+            "errors": dict(self.errors),
+            "phases": {name: {"seconds": round(seconds, 4), "calls": len(self.durations[name])} for name, seconds in self.timings.items()},
+        }
+
+    def emit(self, level=logging.INFO):
+        parts = [f"{key}={value}" for key, value in self.fields.items()]
+        parts += [f"{key}={value}" for key, value in self.counts.items()]
+        parts += [f"{key}={seconds:.2f}s" for key, seconds in self.timings.items()]
+        parts += [f"{key}_errors={errors}" for key, errors in self.errors.items()]
+        parts.append(f"total={self.elapsed:.2f}s")
+        self.logger.log(level, f"[{self.tag}] Summary: {' '.join(parts)}", extra={'summary': True})
+
+
+def track(name):
+    """Time a phase of the active RunSummary (a no-op outside one)"""
+    summary = _current_summary.get()
+    return summary.phase(name) if summary else nullcontext()
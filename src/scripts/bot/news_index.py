@@ -0,0 +1,175 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
+
+from log_setup import setup_logging
+from relative_time import parse_time
+from stream_parser import item_key
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_PATH = os.path.join("fetch-data", ".index", "news.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    domain TEXT NOT NULL,
+    published_at INTEGER,
+    fetched_at INTEGER,
+    title TEXT,
+    link TEXT,
+    content TEXT
+);
+CREATE INDEX IF NOT EXISTS items_domain_published ON items(domain, published_at);
+CREATE INDEX IF NOT EXISTS items_published ON items(published_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5(
+    title, content, content='items', content_rowid='id', tokenize='unicode61'
+);
+CREATE TRIGGER IF NOT EXISTS items_after_insert AFTER INSERT ON items BEGIN
+    INSERT INTO items_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+END;
+CREATE TRIGGER IF NOT EXISTS items_after_delete AFTER DELETE ON items BEGIN
+    INSERT INTO items_fts(items_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+END;
+"""
+
+
+def to_match_query(text):
+    """Quote each word so user input is never parsed as FTS5 syntax"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return ' '.join(f'"{term}"' for term in terms)
+
+
+class NewsIndex:
+    """SQLite FTS5 index over scraped news items"""
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA busy_timeout=30000")  # wait for another scraper's batch instead of failing
+        self.connection.executescript(SCHEMA)
+
+    def add_records(self, domain, records, fetched_at=None):
+        """Index records that are not in the index yet; returns the number added"""
+        with self.connection:
+            return self.insert_records(domain, records, fetched_at)
+
+    def insert_records(self, domain, records, fetched_at=None):
+        """add_records without the commit, for callers that group several batches in one transaction"""
+        fetched_at = int(fetched_at or time.time())
+        rows = (
+            (
+                item_key(record),
+                domain,
+                record.get('timestamp') or parse_time(record.get('time', ''), fetched_at),
+                fetched_at,
+                record.get('title', ''),
+                record.get('link', ''),
+                record.get('content', ''),
+            )
+            for record in records
+        )
+        cursor = self.connection.executemany(
+            "INSERT OR IGNORE INTO items (key, domain, published_at, fetched_at, title, link, content) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        return cursor.rowcount
+
+    def search(self, query, domain=None, start=None, end=None, limit=50, raw=False):
+        """
+        Full-text search ranked by relevance.
+        start/end are epoch seconds on published_at (inclusive/exclusive); raw=True passes
+        the query through as FTS5 syntax (e.g. 'cptpp OR rcep').
+        """
+        sql = [
+            "SELECT items.domain, items.published_at, items.title, items.link, items.content",
+            "FROM items_fts JOIN items ON items.id = items_fts.rowid",
+            "WHERE items_fts MATCH ?"
+        ]
+        params = [query if raw else to_match_query(query)]
+        if domain:
+            sql.append("AND items.domain = ?")
+            params.append(domain)
+        if start is not None:
+            sql.append("AND items.published_at >= ?")
+            params.append(start)
+        if end is not None:
+            sql.append("AND items.published_at < ?")
+            params.append(end)
+        sql.append("ORDER BY bm25(items_fts) LIMIT ?")
+        params.append(limit)
+
+        return [dict(row) for row in self.connection.execute(' '.join(sql), params)]
+
+    def ingest_archive(self, source_dir="fetch-data"):
+        """Backfill the index from existing hourly snapshots"""
+        from archive_compaction import iter_snapshots
+        from snapshot_io import read_snapshot
+
+        added = 0
+        for domain, fetched_at, path in iter_snapshots(source_dir):
+            try:
+                records = read_snapshot(path)
+            except (OSError, ValueError, RuntimeError) as e:
+                logger.warning(f"[INDEX] Skipping unreadable snapshot {path}: {e}")
+                continue
+            added += self.add_records(domain, records, fetched_at)
+        return added
+
+    def close(self):
+        self.connection.close()
+
+
+def _to_epoch(date_text):
+    return int(datetime.strptime(date_text, "%Y-%m-%d").timestamp()) if date_text else None
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Search scraped news items")
+    parser.add_argument('--index', default=INDEX_PATH, help="Path of the SQLite index")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    ingest_parser = subparsers.add_parser('ingest', help="Index existing snapshots under fetch-data/")
+    ingest_parser.add_argument('--source', default="fetch-data")
+
+    search_parser = subparsers.add_parser('search', help="Full-text search")
+    search_parser.add_argument('query')
+    search_parser.add_argument('--domain')
+    search_parser.add_argument('--since', help="YYYY-MM-DD")
+    search_parser.add_argument('--until', help="YYYY-MM-DD (exclusive)")
+    search_parser.add_argument('--limit', type=int, default=20)
+    search_parser.add_argument('--raw', action='store_true', help="Treat the query as FTS5 syntax")
+
+    args = parser.parse_args(argv)
+    setup_logging(stream=sys.stderr)
+    index = NewsIndex(args.index)
+    try:
+        if args.command == 'ingest':
+            added = index.ingest_archive(args.source)
+            print(f"[INDEX] Added {added} items to {args.index}")
+            return
+
+        started = time.perf_counter()
+        results = index.search(args.query, args.domain, _to_epoch(args.since), _to_epoch(args.until), args.limit, args.raw)
+        for row in results:
+            published = datetime.fromtimestamp(row['published_at']).strftime('%Y-%m-%d %H:%M') if row['published_at'] else '?'
+            print(json.dumps({"published": published, "domain": row['domain'], "title": row['title'], "link": row['link']}, ensure_ascii=False))
+        print(f"[INDEX] {len(results)} results in {(time.perf_counter() - started) * 1000:.1f} ms", file=sys.stderr)
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
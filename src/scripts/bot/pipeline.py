@@ -0,0 +1,273 @@
+import itertools
+import json
+import logging
+import time
+
+from scrape_state import domain_lock
+from snapshot_io import SnapshotWriter, find_snapshot, iter_snapshot
+from stream_parser import item_key
+
+
+logger = logging.getLogger(__name__)
+
+
+def peek(records):
+    """(an iterator over all of records, whether it is empty), consuming at most one item to find out"""
+    iterator = iter(records)
+    try:
+        first = next(iterator)
+    except StopIteration:
+        return iter(()), True
+    return itertools.chain([first], iterator), False
+
+
+class Sink:
+    """
+    One destination in the pipeline. write() receives records one at a time, then the
+    pipeline calls exactly one of commit() or abort(). A failing required sink means the
+    run was not saved; optional sinks are only committed once every required one was.
+    """
+
+    name = 'sink'
+    required = False
+
+    def write(self, record):
+        raise NotImplementedError
+
+    def commit(self):
+        pass
+
+    def abort(self):
+        pass
+
+
+class BatchSink(Sink):
+    """Sink that hands records on in fixed-size batches, so memory stays bounded"""
+
+    def __init__(self, batch_size=100):
+        self.batch_size = batch_size
+        self.batch = []
+
+    def write(self, record):
+        self.batch.append(record)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.write_batch(self.batch)
+            self.batch = []
+
+    def write_batch(self, records):
+        raise NotImplementedError
+
+    def commit(self):
+        self.flush()
+
+
+class SnapshotSink(Sink):
+    """
+    Hourly JSON snapshot, written as the array goes along (same layout as json.dumps(records, indent=4)).
+    New items arrive newest first; with merge_existing, the items an earlier run wrote to the same
+    snapshot are streamed in after them at commit, so the file stays newest first. The merge and the
+    rename run under the domain lock, so two runs writing the same hour both keep their items.
+    """
+
+    name = 'snapshot'
+    required = True
+
+    def __init__(self, path, domain, compression='none', merge_existing=True):
+        self.source_path = path
+        self.domain = domain
+        self.compression = compression
+        self.merge_existing = merge_existing
+        self.writer = SnapshotWriter(path, compression)
+        self.keys = set()
+        self.count = 0
+        self.path = None
+
+    def write(self, record):
+        if self.merge_existing:
+            self.keys.add(item_key(record))
+        self._write_item(record)
+
+    def _write_item(self, record):
+        text = json.dumps(record, indent=4).replace('\n', '\n    ')
+        self.writer.write(('[\n    ' if self.count == 0 else ',\n    ') + text)
+        self.count += 1
+
+    def commit(self):
+        written = self.count
+        with domain_lock(self.domain):
+            existing_path = find_snapshot(self.source_path, self.compression) if self.merge_existing else None
+            if existing_path:
+                try:
+                    for record in iter_snapshot(existing_path):
+                        if item_key(record) not in self.keys:
+                            self._write_item(record)
+                except (OSError, ValueError, RuntimeError) as e:
+                    logger.warning(f"[SAVE] Could not merge {existing_path}: {e}")
+            self.writer.write('\n]' if self.count else '[]')
+            self.path = self.writer.commit()
+        logger.info(f"[SAVE] Wrote {written} new of {self.count} items to {self.path}")
+        return self.path
+
+    def abort(self):
+        self.writer.abort()
+
+
+class NdjsonSink(BatchSink):
+    """Deduplicated NDJSON item store (item_store.ItemStore)"""
+
+    name = 'ndjson'
+    required = True
+
+    def __init__(self, item_store, fetched_at=None, batch_size=100):
+        super().__init__(batch_size)
+        self.item_store = item_store
+        self.fetched_at = fetched_at
+        self.added = 0
+
+    def write_batch(self, records):
+        self.added += self.item_store.append(records, fetched_at=self.fetched_at)
+
+    def commit(self):
+        super().commit()
+        logger.info(f"[STORE] Appended {self.added} new items to {self.item_store.shard_path()}")
+        return self.added
+
+
+class IndexSink(BatchSink):
+    """
+    Full-text search index (news_index.NewsIndex). Each batch is its own short transaction, so
+    scrapers sharing the index never hold its write lock for a whole extraction. Batches indexed
+    before an abort stay; the next run fetches those items again and INSERT OR IGNORE skips them.
+    """
+
+    name = 'index'
+
+    def __init__(self, news_index, domain, fetched_at=None, batch_size=100):
+        super().__init__(batch_size)
+        self.news_index = news_index
+        self.domain = domain
+        self.fetched_at = fetched_at
+        self.added = 0
+
+    def write_batch(self, records):
+        self.added += self.news_index.add_records(self.domain, records, self.fetched_at)
+
+    def commit(self):
+        super().commit()
+        logger.info(f"[INDEX] Indexed {self.added} new items")
+        return self.added
+
+    def abort(self):
+        self.batch = []
+
+
+class HighWaterSink(Sink):
+    """Move the incremental high-water mark (scrape_state.HighWaterMark) once the items are stored"""
+
+    name = 'high_water'
+
+    def __init__(self, high_water):
+        self.high_water = high_water
+        self.keys = []
+        self.links = []
+
+    def write(self, record):
+        # The mark only needs identities, not whole items
+        self.keys.append(item_key(record))
+        if record.get('link'):
+            self.links.append(record['link'])
+
+    def commit(self):
+        self.high_water.update_identities(self.keys, self.links)
+
+
+class QueueSink(Sink):
+    """Hand each record to a consumer thread as soon as it is extracted; DONE follows the last one"""
+
+    name = 'queue'
+    DONE = None
+
+    def __init__(self, target):
+        self.target = target
+
+    def write(self, record):
+        self.target.put(record)
+
+    def commit(self):
+        self.target.put(self.DONE)
+
+    def abort(self):
+        self.target.put(self.DONE)
+
+
+class PipelineResult:
+    """Outcome of one run_pipeline call"""
+
+    def __init__(self, count=0, saved=False, results=None, failed=None):
+        self.count = count
+        self.saved = saved
+        self.results = results or {}  # sink name -> commit() return value
+        self.failed = failed or []  # names of sinks that raised
+
+
+def run_pipeline(records, sinks, summary=None):
+    """
+    Push records through every sink one at a time, then commit the required sinks and,
+    if they all succeeded, the optional ones. Sinks keep at most a batch of records (plus item keys).
+    With a RunSummary, time spent inside the sinks is charged to its 'save' phase (producing the records is not).
+    """
+    result = PipelineResult()
+    active = list(sinks)
+    saving = 0.0
+
+    def fail(sink, e, stage):
+        logger.error(f"[ERROR] {sink.name} sink failed during {stage}: {e}")
+        result.failed.append(sink.name)
+        active.remove(sink)
+        try:
+            sink.abort()
+        except Exception as abort_error:
+            logger.error(f"[ERROR] {sink.name} sink failed to abort: {abort_error}")
+
+    try:
+        for record in records:
+            result.count += 1
+            started = time.perf_counter()
+            for sink in list(active):
+                try:
+                    sink.write(record)
+                except Exception as e:
+                    fail(sink, e, 'write')
+            saving += time.perf_counter() - started
+            if any(sink.required for sink in sinks) and not any(sink.required for sink in active):
+                break  # every store failed: stop extracting
+    except Exception:
+        for sink in active:
+            sink.abort()
+        raise
+
+    started = time.perf_counter()
+    try:
+        for sink in [sink for sink in active if sink.required]:
+            try:
+                result.results[sink.name] = sink.commit()
+            except Exception as e:
+                fail(sink, e, 'commit')
+
+        result.saved = not any(sink.required for sink in sinks if sink.name in result.failed)
+        for sink in [sink for sink in active if not sink.required]:
+            if not result.saved:
+                sink.abort()
+                continue
+            try:
+                result.results[sink.name] = sink.commit()
+            except Exception as e:
+                fail(sink, e, 'commit')
+    finally:
+        if summary:
+            summary.charge('save', saving + time.perf_counter() - started)
+    return result
@@ -0,0 +1,99 @@
+import re
+import time
+from datetime import datetime
+
+
+UNIT_SECONDS = {
+    'second': 1,
+    'sec': 1,
+    'minute': 60,
+    'min': 60,
+    'hour': 3600,
+    'hr': 3600,
+    'day': 86400,
+    'week': 7 * 86400,
+    'month': 30 * 86400,
+    'year': 365 * 86400,
+}
+
+RELATIVE_TIME_RE = re.compile(
+    r'\b(\d+|an?|one)\s+(second|sec|minute|min|hour|hr|day|week|month|year)s?\s+ago\b',
+    re.IGNORECASE
+)
+JUST_NOW_RE = re.compile(r'\b(just now|now)\b', re.IGNORECASE)
+YESTERDAY_RE = re.compile(r'\byesterday\b', re.IGNORECASE)
+
+ABSOLUTE_FORMATS = [
+    '%Y-%m-%dT%H:%M:%S',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d %H:%M',
+    '%Y-%m-%d',
+    '%b %d, %Y %H:%M',
+    '%b %d, %Y',
+    '%B %d, %Y',
+    '%d %b %Y',
+    '%d %B %Y',
+    '%m/%d/%Y',
+]
+
+
+def parse_age(time_text):
+    """Age in seconds of a relative time string ("3 minutes ago"), or None"""
+    match = RELATIVE_TIME_RE.search(time_text)
+    if match:
+        amount, unit = match.groups()
+        amount = int(amount) if amount.isdigit() else 1
+        return amount * UNIT_SECONDS[unit.lower()]
+    if JUST_NOW_RE.search(time_text):
+        return 0
+    if YESTERDAY_RE.search(time_text):
+        return 86400
+    return None
+
+
+def parse_time(time_text, fetched_at=None):
+    """
+    Convert a scraped time string to an epoch timestamp in seconds (src/utils/post-data.ts converts to milliseconds).
+    Relative strings are resolved against fetched_at (epoch seconds, default now).
+    """
+    if not time_text:
+        return None
+    if fetched_at is None:
+        fetched_at = time.time()
+
+    age = parse_age(time_text)
+    if age is not None:
+        return int(fetched_at - age)
+
+    text = time_text.strip()
+    for fmt in ABSOLUTE_FORMATS:
+        try:
+            return int(datetime.strptime(text, fmt).timestamp())
+        except ValueError:
+            continue
+    return None
+
+
+def sort_records(records):
+    """Newest first; records without a timestamp keep their relative order at the end"""
+    return sorted(records, key=lambda record: -(record.get('timestamp') or float('-inf')))
+
+
+def iter_normalized(records, fetched_at=None):
+    """Streaming normalize_records: add the absolute 'timestamp' as records pass through, keeping their order"""
+    if fetched_at is None:
+        fetched_at = time.time()
+    for record in records:
+        if record.get('timestamp') is None:
+            record['timestamp'] = parse_time(record.get('time', ''), fetched_at)
+        yield record
+
+
+def normalize_records(records, fetched_at=None):
+    """Add an absolute 'timestamp' to each record and return them sorted newest first"""
+    if fetched_at is None:
+        fetched_at = time.time()
+    for record in records:
+        if record.get('timestamp') is None:
+            record['timestamp'] = parse_time(record.get('time', ''), fetched_at)
+    return sort_records(records)
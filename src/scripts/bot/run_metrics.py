@@ -0,0 +1,145 @@
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.path.join("fetch-data", ".metrics")
+
+# Upper bounds (seconds) for the latency histograms; p95 comes from histogram_quantile()
+BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+_lock = threading.Lock()
+
+
+def _new_histogram():
+    return {"sum": 0.0, "count": 0, "buckets": [0] * len(BUCKETS)}
+
+
+def _observe(histogram, seconds):
+    histogram["sum"] += seconds
+    histogram["count"] += 1
+    for position, bound in enumerate(BUCKETS):
+        if seconds <= bound:
+            histogram["buckets"][position] += 1
+
+
+@contextmanager
+def _locked(path):
+    """Serialize updates across threads and, where flock exists, across processes"""
+    with _lock:
+        with open(path, 'a+', encoding='utf-8') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        file.write(text)
+    os.replace(tmp_path, path)
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(name, labels, histogram):
+    lines = []
+    for bound, cumulative in zip(BUCKETS, histogram["buckets"]):
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+    lines.append(f'{name}_sum{{{labels}}} {histogram["sum"]:.6f}')
+    lines.append(f'{name}_count{{{labels}}} {histogram["count"]}')
+    return lines
+
+
+def render_prometheus(job, state):
+    """Prometheus text exposition of the cumulative state (node_exporter textfile format)"""
+    sections = {
+        'runs': (f"{job}_runs_total", "counter", "Runs by final status"),
+        'run_seconds': (f"{job}_run_seconds", "histogram", "Wall time of a whole run"),
+        'phase_seconds': (f"{job}_phase_seconds", "histogram", "Wall time per phase call"),
+        'phase_errors': (f"{job}_phase_errors_total", "counter", "Errors per phase"),
+        'counts': (f"{job}_count_total", "counter", "Items, scrolls and other per-run counters"),
+        'last_run': (f"{job}_last_run_timestamp_seconds", "gauge", "Start time of the latest run"),
+    }
+    lines = {key: [] for key in sections}
+
+    for source, data in sorted(state.items()):
+        source_label = f'source="{_label(source)}"'
+        for status, total in sorted(data["runs"].items()):
+            lines['runs'].append(f'{sections["runs"][0]}{{{source_label},status="{_label(status)}"}} {total}')
+        lines['run_seconds'] += _histogram_lines(sections['run_seconds'][0], source_label, data["run_seconds"])
+        for phase, histogram in sorted(data["phases"].items()):
+            lines['phase_seconds'] += _histogram_lines(sections['phase_seconds'][0], f'{source_label},phase="{_label(phase)}"', histogram)
+        for phase, total in sorted(data["errors"].items()):
+            lines['phase_errors'].append(f'{sections["phase_errors"][0]}{{{source_label},phase="{_label(phase)}"}} {total}')
+        for name, total in sorted(data["counts"].items()):
+            lines['counts'].append(f'{sections["counts"][0]}{{{source_label},name="{_label(name)}"}} {total}')
+        lines['last_run'].append(f'{sections["last_run"][0]}{{{source_label}}} {data["last_run"]:.3f}')
+
+    output = []
+    for key, (name, metric_type, help_text) in sections.items():
+        if not lines[key]:
+            continue
+        output.append(f"# HELP {name} {help_text}")
+        output.append(f"# TYPE {name} {metric_type}")
+        output += lines[key]
+    return '\n'.join(output) + '\n'
+
+
+def export_run(summary, job, source='default', metrics_dir=METRICS_DIR):
+    """
+    Record one finished run:
+    - append its JSON summary to <metrics_dir>/<job>-runs.ndjson
+    - fold it into cumulative counters/histograms and rewrite <metrics_dir>/<job>.prom
+    Failures are logged, never raised, so metrics cannot break a fetch or an analysis.
+    """
+    try:
+        os.makedirs(metrics_dir, exist_ok=True)
+        record = dict(summary.to_dict(), job=job, source=source)
+        with open(os.path.join(metrics_dir, f"{job}-runs.ndjson"), 'a', encoding='utf-8') as file:
+            file.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+
+        state_path = os.path.join(metrics_dir, f"{job}.state.json")
+        with _locked(os.path.join(metrics_dir, f"{job}.lock")):
+            try:
+                with open(state_path, 'r', encoding='utf-8') as file:
+                    state = json.load(file)
+            except (OSError, ValueError):
+                state = {}
+
+            data = state.setdefault(source, {
+                "runs": {}, "run_seconds": _new_histogram(), "phases": {}, "errors": {}, "counts": {}, "last_run": 0
+            })
+            status = str(summary.fields.get('status', 'done'))
+            data["runs"][status] = data["runs"].get(status, 0) + 1
+            _observe(data["run_seconds"], summary.elapsed)
+            for phase, durations in summary.durations.items():
+                histogram = data["phases"].setdefault(phase, _new_histogram())
+                for seconds in durations:
+                    _observe(histogram, seconds)
+            for phase, errors in summary.errors.items():
+                data["errors"][phase] = data["errors"].get(phase, 0) + errors
+            for name, amount in summary.counts.items():
+                data["counts"][name] = data["counts"].get(name, 0) + amount
+            data["last_run"] = summary.started_at
+
+            _write_atomic(state_path, json.dumps(state))
+            _write_atomic(os.path.join(metrics_dir, f"{job}.prom"), render_prometheus(job, state))
+    except Exception as e:
+        logger.error(f"[METRICS] Failed to export {job} metrics: {e}")
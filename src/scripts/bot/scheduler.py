@@ -0,0 +1,131 @@
+import asyncio
+import logging
+import random
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+
+logger = logging.getLogger(__name__)
+
+
+class ScheduledJob:
+    """One recurring job: a blocking callable run every `interval` seconds"""
+
+    def __init__(self, name, func, interval, jitter=0, max_catch_up=1):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter  # random delay (seconds) added to each run so sources do not fire together
+        self.max_catch_up = max_catch_up  # missed runs replayed after a pause (e.g. machine asleep); 0 disables catch-up
+        self.next_slot = None  # nominal start time on the interval grid (epoch seconds)
+        self.due_at = None  # next_slot plus this run's jitter
+        self.task = None
+        self.runs = 0
+        self.skipped = 0
+
+    def schedule_from(self, slot):
+        self.next_slot = slot
+        self.due_at = slot + (random.uniform(0, self.jitter) if self.jitter else 0)
+
+    @property
+    def running(self):
+        return self.task is not None and not self.task.done()
+
+
+class AsyncScheduler:
+    """
+    Run many blocking jobs on their own intervals from one asyncio loop.
+
+    Slots stay on a fixed grid (start + n * interval) so jobs do not drift; a job
+    that is still running when its next slot comes is skipped rather than stacked;
+    after a pause up to max_catch_up missed slots are replayed as well. Wall-clock
+    time is re-checked at least every `tick` seconds so suspends are noticed.
+    """
+
+    def __init__(self, max_workers=4, tick=30):
+        self.jobs = []
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="scheduler")
+        self.tick = tick
+        self.stop_event = None
+
+    def add_job(self, name, func, interval, jitter=0, max_catch_up=1, run_immediately=True):
+        job = ScheduledJob(name, func, interval, jitter, max_catch_up)
+        now = time.time()
+        job.schedule_from(now if run_immediately else now + interval)
+        if run_immediately:
+            job.due_at = now  # the first run is not jittered
+        self.jobs.append(job)
+        return job
+
+    async def _run_job(self, job, times):
+        loop = asyncio.get_running_loop()
+        for attempt in range(times):
+            if self.stop_event.is_set():
+                break
+            started = time.perf_counter()
+            logger.info(f"[SCHEDULE] Running {job.name} at {datetime.now()}" + (f" (catch-up {attempt + 1}/{times})" if times > 1 else ""))
+            try:
+                await loop.run_in_executor(self.executor, job.func)
+            except Exception as e:
+                logger.error(f"[ERROR] Scheduled job {job.name} failed: {e}")
+            job.runs += 1
+            logger.info(f"[SCHEDULE] {job.name} finished in {time.perf_counter() - started:.1f}s")
+
+    def _start_due_jobs(self, now):
+        for job in self.jobs:
+            if now < job.due_at:
+                continue
+
+            missed = int((now - job.next_slot) // job.interval) + 1
+            job.schedule_from(job.next_slot + missed * job.interval)
+
+            if job.running:
+                job.skipped += missed
+                logger.info(f"[SCHEDULE] Skipping {job.name}: previous run still in progress")
+                continue
+            # The current slot always runs; earlier missed slots are replayed up to max_catch_up times
+            replays = min(missed - 1, job.max_catch_up)
+            if missed - 1 > replays:
+                job.skipped += missed - 1 - replays
+                logger.info(f"[SCHEDULE] {job.name} missed {missed - 1} runs, catching up {replays}")
+
+            job.task = asyncio.create_task(self._run_job(job, 1 + replays))
+
+    async def run(self):
+        """Run until stop() or SIGINT/SIGTERM, then wait for in-flight jobs"""
+        self.stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                pass  # not on the main thread or not supported on this platform
+
+        for job in self.jobs:
+            logger.info(f"[SCHEDULE] {job.name}: every {job.interval}s (jitter up to {job.jitter}s)")
+
+        while not self.stop_event.is_set():
+            now = time.time()
+            self._start_due_jobs(now)
+            next_due = min(job.due_at for job in self.jobs) if self.jobs else now + self.tick
+            try:
+                await asyncio.wait_for(self.stop_event.wait(), timeout=max(0, min(next_due - now, self.tick)))
+            except asyncio.TimeoutError:
+                pass
+
+        in_flight = [job.task for job in self.jobs if job.running]
+        if in_flight:
+            logger.info(f"[SCHEDULE] Waiting for {len(in_flight)} running job(s) to finish...")
+            await asyncio.gather(*in_flight, return_exceptions=True)
+        self.executor.shutdown(wait=True)
+        logger.info("[SCHEDULE] Scheduler stopped")
+
+    def stop(self):
+        if self.stop_event and not self.stop_event.is_set():
+            logger.info("[SCHEDULE] Shutdown requested")
+            self.stop_event.set()
+
+    def run_forever(self):
+        asyncio.run(self.run())
@@ -0,0 +1,165 @@
+import json
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from urllib.parse import urlparse
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from stream_parser import item_key
+
+
+STATE_DIR = os.path.join("fetch-data", ".state")
+
+_locks = {}  # lock file path -> threading.Lock
+_locks_guard = threading.Lock()
+_held = threading.local()  # lock files the current thread holds, so nested calls do not deadlock
+
+
+def domain_from_url(url):
+    """Folder-safe domain name, as used under fetch-data/"""
+    return urlparse(url).netloc.replace('.', '_')
+
+
+def state_path(domain, state_dir=STATE_DIR):
+    return os.path.join(state_dir, f"{domain}.json")
+
+
+@contextmanager
+def domain_lock(domain, state_dir=STATE_DIR):
+    """
+    Serialize read-modify-write of one domain's state and snapshots: across threads with a
+    lock per domain and, where flock exists, across processes. Re-entrant within a thread.
+    """
+    lock_path = os.path.join(state_dir, f"{domain}.lock")
+    held = _held.__dict__.setdefault('paths', set())
+    if lock_path in held:
+        yield
+        return
+
+    with _locks_guard:
+        lock = _locks.setdefault(lock_path, threading.Lock())
+    with lock:
+        os.makedirs(state_dir, exist_ok=True)
+        with open(lock_path, 'a+', encoding='utf-8') as lock_file:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            held.add(lock_path)
+            try:
+                yield
+            finally:
+                held.discard(lock_path)
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def load_state(domain, state_dir=STATE_DIR):
+    """Load the per-domain state file, returning an empty dict if it is missing or unreadable"""
+    try:
+        with open(state_path(domain, state_dir), 'r', encoding='utf-8') as file:
+            state = json.load(file)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(domain, state, state_dir=STATE_DIR):
+    """Write the per-domain state file through a temp file so it is never left half-written"""
+    os.makedirs(state_dir, exist_ok=True)
+    path = state_path(domain, state_dir)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"  # one per writer, so concurrent saves never share it
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(state, file)
+    os.replace(tmp_path, path)
+
+
+def update_state(domain, section, value, state_dir=STATE_DIR):
+    """Replace one section of the per-domain state, keeping the others"""
+    with domain_lock(domain, state_dir):
+        state = load_state(domain, state_dir)
+        state[section] = value
+        save_state(domain, state, state_dir)
+
+
+class HighWaterMark:
+    """Identities of the newest items already scraped for one domain"""
+
+    def __init__(self, domain, max_items=500, state_dir=STATE_DIR):
+        self.domain = domain
+        self.max_items = max_items
+        self.state_dir = state_dir
+
+        section = load_state(domain, state_dir).get('high_water', {})
+        self.keys = section.get('keys', [])
+        self.links = section.get('links', [])
+        self.seen_keys = set(self.keys)
+        self.seen_links = set(self.links)
+
+    def update(self, records):
+        """Record newly saved items (newest first) and persist the mark"""
+        self.update_identities([item_key(record) for record in records], [record['link'] for record in records if record.get('link')])
+
+    def update_identities(self, new_keys, new_links):
+        """update() for callers that only kept item keys and links (newest first)"""
+        with domain_lock(self.domain, self.state_dir):
+            # Re-read the mark: another source for the same domain may have moved it since we loaded it
+            section = load_state(self.domain, self.state_dir).get('high_water', {})
+            self.keys = _merge_newest(new_keys, section.get('keys', []) + self.keys, self.max_items)
+            self.links = _merge_newest(new_links, section.get('links', []) + self.links, self.max_items)
+            self.seen_keys = set(self.keys)
+            self.seen_links = set(self.links)
+
+            update_state(self.domain, 'high_water', {
+                "keys": self.keys,
+                "links": self.links,
+                "updated_at": datetime.now().isoformat()
+            }, self.state_dir)
+
+
+class PageFingerprint:
+    """What the top of a domain's stream looked like last run: item hash plus the HTTP validators"""
+
+    FIELDS = ('digest', 'etag', 'last_modified')
+
+    def __init__(self, domain, state_dir=STATE_DIR):
+        self.domain = domain
+        self.state_dir = state_dir
+
+        section = load_state(domain, state_dir).get('fingerprint', {})
+        self.digest = section.get('digest')
+        self.etag = section.get('etag')
+        self.last_modified = section.get('last_modified')
+        self.observed = {}
+
+    def observe(self, **values):
+        """Note values seen during this run; they are only stored by commit()"""
+        self.observed.update((key, value) for key, value in values.items() if value is not None)
+
+    def commit(self):
+        """Persist what this run observed, once its items were saved (or there were none)"""
+        if not self.observed:
+            return
+        for key in self.FIELDS:
+            setattr(self, key, self.observed.get(key, getattr(self, key)))
+        self.observed = {}
+        update_state(self.domain, 'fingerprint', {
+            "digest": self.digest,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "updated_at": datetime.now().isoformat()
+        }, self.state_dir)
+
+
+def _merge_newest(newest, previous, limit):
+    merged = []
+    seen = set()
+    for value in newest + previous:
+        if value not in seen:
+            seen.add(value)
+            merged.append(value)
+    return merged[:limit]
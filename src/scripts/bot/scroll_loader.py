@@ -0,0 +1,94 @@
+import hashlib
+import logging
+import random
+import time
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from stream_parser import is_too_old
+
+
+logger = logging.getLogger(__name__)
+
+# One round-trip returns everything the loop needs: item count, page height and the last item's time and link.
+# Arguments: item selector, title selector, time selectors (CSS, tried in order)
+STREAM_STATE_SCRIPT = """
+const items = document.querySelectorAll(arguments[0]);
+const last = items.length ? items[items.length - 1] : null;
+const time = last ? arguments[2].map(selector => last.querySelector(selector)).find(element => element) : null;
+const link = last ? last.querySelector(arguments[1]) : null;
+return [items.length, document.body.scrollHeight, time ? time.textContent.trim() : '', link ? link.getAttribute('href') || '' : ''];
+"""
+
+
+# Link and title of the first items; relative times ("2 hours ago") drift between runs, so they are left out
+TOP_ITEMS_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[1])).slice(0, arguments[0]).map(li => {
+    const link = li.querySelector(arguments[2]);
+    return link ? (link.getAttribute('href') || '') + '\\x1f' + link.textContent.trim() : li.textContent.trim().slice(0, 200);
+});
+"""
+
+
+def stream_fingerprint(driver, adapter, top=10):
+    """Hash of the first `top` stream items (site_adapters.SiteAdapter selectors), or None if the stream is empty"""
+    items = driver.execute_script(TOP_ITEMS_SCRIPT, top, adapter.item, adapter.title)
+    if not items:
+        return None
+    return hashlib.sha1('\x1e'.join(items).encode('utf-8')).hexdigest()[:16]
+
+
+def get_stream_state(driver, adapter):
+    time_selectors = [selector for by, selector, label in adapter.time if by == By.CSS_SELECTOR]
+    item_count, height, last_time, last_link = driver.execute_script(STREAM_STATE_SCRIPT, adapter.item, adapter.title, time_selectors)
+    return item_count, height, last_time, last_link
+
+
+def scroll_stream(driver, adapter, max_hour=48, max_day=2, timeout=5, poll_frequency=0.2, max_scrolls=100, pause_range=None, seen_links=None):
+    """
+    Scroll until the stream stops growing, its last item falls outside the age window,
+    or the last item is one the previous run already stored (seen_links).
+    Items are located with the site_adapters.SiteAdapter selectors.
+    Waits on DOM growth instead of sleeping a fixed interval; returns the number of scrolls.
+    """
+    item_count, height, last_time, last_link = get_stream_state(driver, adapter)
+    scroll_count = 0
+
+    while scroll_count < max_scrolls:
+        if last_time and is_too_old(last_time, max_hour, max_day):
+            logger.info(f"[SCROLL] Last item is outside the age window ({last_time}), stopping")
+            break
+
+        if seen_links and last_link in seen_links:
+            logger.info(f"[SCROLL] Reached items already scraped ({last_link}), stopping")
+            break
+
+        scroll_count += 1
+        logger.debug(f"[SCROLL] Scroll attempt #{scroll_count} ({item_count} items loaded)")
+
+        if pause_range:
+            time.sleep(random.uniform(*pause_range))
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+
+        previous_count, previous_height = item_count, height
+        try:
+            item_count, height, last_time, last_link = WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(
+                lambda d: _grown_state(d, adapter, previous_count, previous_height)
+            )
+        except TimeoutException:
+            logger.info("[SCROLL] Reached bottom of page")
+            break
+
+        logger.debug(f"[SCROLL] New content loaded ({item_count} items, height: {height}px)")
+
+    return scroll_count
+
+
+def _grown_state(driver, adapter, previous_count, previous_height):
+    state = get_stream_state(driver, adapter)
+    item_count, height = state[0], state[1]
+    if item_count > previous_count or height != previous_height:
+        return state
+    return False
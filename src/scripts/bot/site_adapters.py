@@ -0,0 +1,116 @@
+import logging
+from datetime import datetime
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+from scrape_state import STATE_DIR, load_state, update_state
+from stream_parser import CONTAINER_SELECTORS, TITLE_SELECTOR
+
+
+logger = logging.getLogger(__name__)
+
+
+class SiteAdapter:
+    """
+    Where a site keeps its stream. Container and time selectors are ordered fallbacks of
+    (By strategy, selector, label); the label is what gets remembered per domain.
+    """
+
+    def __init__(self, container, item, title, time):
+        self.container = list(container)
+        self.item = item  # CSS selector for items, relative to the container
+        self.title = title  # CSS selector for the title link, relative to an item
+        self.time = list(time)
+
+
+# The stream layout the parsers in stream_parser.py were written for
+TRADING_ECONOMICS = SiteAdapter(
+    container=[(By.XPATH, selector, label) for selector, label in CONTAINER_SELECTORS],
+    item='li.te-stream-item',
+    title=TITLE_SELECTOR,
+    time=[
+        (By.CSS_SELECTOR, 'small', "Small tag"),
+        (By.CSS_SELECTOR, 'span[class*="time"]', "Time span"),
+        (By.CSS_SELECTOR, 'div[class*="time"]', "Time div"),
+        (By.XPATH, './/*[contains(text(), "ago")]', "Text containing ago"),
+    ],
+)
+
+DEFAULT_ADAPTER = TRADING_ECONOMICS
+
+# Keyed like the fetch-data/ folders (see scrape_state.domain_from_url)
+ADAPTERS = {
+    'tradingeconomics_com': TRADING_ECONOMICS,
+}
+
+
+def get_adapter(domain=None):
+    if domain and domain.startswith('www_'):
+        domain = domain[4:]
+    return ADAPTERS.get(domain, DEFAULT_ADAPTER)
+
+
+class SelectorPlan:
+    """
+    A domain's adapter with its fallbacks reordered so the selector that matched last
+    time is tried first. Choices are kept in the 'selectors' section of the domain state.
+    """
+
+    def __init__(self, domain, adapter=None, persist=True, state_dir=STATE_DIR):
+        self.domain = domain
+        self.adapter = adapter or get_adapter(domain)
+        self.persist = persist  # False: remember choices for this object only
+        self.state_dir = state_dir
+        self.choices = load_state(domain, state_dir).get('selectors', {}) if persist else {}
+        self.failed_lookups = 0
+
+    def ordered(self, kind):
+        """Fallbacks for 'container' or 'time', the remembered one first"""
+        candidates = getattr(self.adapter, kind)
+        preferred = self.choices.get(kind)
+        return sorted(candidates, key=lambda candidate: candidate[2] != preferred)
+
+    def container_xpaths(self):
+        """Ordered (xpath, label) container fallbacks for the lxml parser"""
+        return [(selector, label) for by, selector, label in self.ordered('container') if by == By.XPATH]
+
+    def remember(self, kind, label):
+        """Persist the selector that matched, if it is one of the adapter's and differs from the stored choice"""
+        if self.choices.get(kind) == label or label not in [candidate[2] for candidate in getattr(self.adapter, kind)]:
+            return
+        self.choices[kind] = label
+        if self.persist:
+            update_state(self.domain, 'selectors', dict(self.choices, updated_at=datetime.now().isoformat()), self.state_dir)
+            logger.info(f"[SELECTOR] Will try '{label}' first for the {kind} of {self.domain}")
+
+    def find_container(self, driver, timeout=5):
+        """
+        Container element and its label. Only the first candidate waits (the page may still be
+        rendering); the rest are single lookups, so a stale choice costs one timeout at most.
+        """
+        for position, (by, selector, label) in enumerate(self.ordered('container')):
+            if position == 0:
+                try:
+                    elements = WebDriverWait(driver, timeout).until(lambda d: d.find_elements(by, selector))
+                except TimeoutException:
+                    elements = []
+            else:
+                elements = driver.find_elements(by, selector)
+            if elements:
+                self.remember('container', label)
+                return elements[0], label
+            self.failed_lookups += 1
+            logger.debug(f"[EXTRACT] {label} not found, trying next...")
+        return None, None
+
+    def find_time(self, item):
+        """Time text of one item, trying the remembered selector first; '' if none matched"""
+        for by, selector, label in self.ordered('time'):
+            elements = item.find_elements(by, selector)
+            if elements:
+                self.remember('time', label)
+                return elements[0].text.strip()
+            self.failed_lookups += 1
+        return ''
@@ -0,0 +1,216 @@
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import sys
+import uuid
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from log_setup import setup_logging
+
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_SUFFIXES = {
+    'none': '',
+    'gzip': '.gz',
+    'zstd': '.zst',
+}
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+
+def _require_zstandard():
+    if zstandard is None:
+        raise RuntimeError("zstandard is required for zstd snapshots (pip install zstandard)")
+
+
+def compressed_path(path, compression='none'):
+    """Path of the snapshot for `path` (the legacy .txt name) under the given compression"""
+    if compression not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Unknown compression: {compression} (expected one of {', '.join(COMPRESSION_SUFFIXES)})")
+    return path + COMPRESSION_SUFFIXES[compression]
+
+
+def snapshot_variants(path):
+    """Every name a snapshot for `path` may have been written under"""
+    return [path + suffix for suffix in COMPRESSION_SUFFIXES.values()]
+
+
+def find_snapshot(path, compression='none'):
+    """Existing snapshot for `path`, preferring the given compression; None if there is none"""
+    preferred = compressed_path(path, compression)
+    for candidate in [preferred] + snapshot_variants(path):
+        if os.path.exists(candidate):
+            return candidate
+    return None
+
+
+class SnapshotWriter:
+    """
+    Write a snapshot piece by piece: text is compressed into a temp file in the same
+    folder as it arrives, and commit() fsyncs and renames it over the target. Other
+    compression variants of the same snapshot are removed afterwards.
+    """
+
+    def __init__(self, path, compression='none'):
+        self.path = path
+        self.final_path = compressed_path(path, compression)
+        self.folder_path = os.path.dirname(self.final_path) or '.'
+        os.makedirs(self.folder_path, exist_ok=True)
+
+        # Unique per writer: threads share a pid, and two runs may write the same hour at once
+        self.tmp_path = f"{self.final_path}.{uuid.uuid4().hex}.tmp"
+        self.raw = open(self.tmp_path, 'xb')
+        self.compressor = None
+        if compression == 'gzip':
+            self.compressor = gzip.GzipFile(fileobj=self.raw, mode='wb', compresslevel=6, mtime=0)
+        elif compression == 'zstd':
+            _require_zstandard()
+            self.compressor = zstandard.ZstdCompressor(level=10).stream_writer(self.raw)
+        self.compression = compression
+
+    def write(self, text):
+        (self.compressor or self.raw).write(text.encode('utf-8'))
+
+    def commit(self):
+        """Finish the file and move it into place; returns the written path"""
+        try:
+            if self.compression == 'gzip':
+                self.compressor.close()  # writes the trailer, leaves self.raw open
+            elif self.compression == 'zstd':
+                self.compressor.flush(zstandard.FLUSH_FRAME)
+            self.raw.flush()
+            os.fsync(self.raw.fileno())
+            self.raw.close()
+            os.replace(self.tmp_path, self.final_path)
+        except BaseException:
+            self.abort()
+            raise
+
+        # Persist the rename itself
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(self.folder_path, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+        for stale_path in snapshot_variants(self.path):
+            if stale_path != self.final_path and os.path.exists(stale_path):
+                os.remove(stale_path)
+        return self.final_path
+
+    def abort(self):
+        """Drop the partial file, leaving any previous snapshot untouched"""
+        self.raw.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+
+def write_snapshot(path, data, compression='none'):
+    """Write `data` (str) to the snapshot for `path` atomically (see SnapshotWriter); returns the written path"""
+    writer = SnapshotWriter(path, compression)
+    try:
+        writer.write(data)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.commit()
+
+
+def open_snapshot(path):
+    """Open a snapshot for reading as text, whether it is plain, gzip or zstd"""
+    with open(path, 'rb') as file:
+        magic = file.read(4)
+
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if magic.startswith(ZSTD_MAGIC):
+        _require_zstandard()
+        raw = open(path, 'rb')
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True), encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def read_snapshot(path):
+    """Load the records stored in a snapshot"""
+    with open_snapshot(path) as file:
+        return json.load(file)
+
+
+def iter_snapshot(path, chunk_size=65536):
+    """Yield the records of a snapshot one at a time, reading it in chunks instead of loading the whole array"""
+    decoder = json.JSONDecoder()
+    with open_snapshot(path) as file:
+        buffer = file.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{path} does not hold a JSON array")
+        buffer = buffer[1:]
+        while True:
+            buffer = buffer.lstrip()
+            if buffer.startswith(','):
+                buffer = buffer[1:].lstrip()
+            if buffer.startswith(']'):
+                return
+            try:
+                record, end = decoder.raw_decode(buffer)
+            except ValueError:
+                # The next record continues in the next chunk (or the file is truncated)
+                chunk = file.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer += chunk
+                continue
+            yield record
+            buffer = buffer[end:]
+
+
+def convert_tree(source_dir, compression):
+    """Rewrite every snapshot under source_dir with the given compression; returns (files, bytes before, bytes after)"""
+    from archive_compaction import iter_snapshots
+
+    converted, before, after = 0, 0, 0
+    for _, _, path in iter_snapshots(source_dir):
+        base_path = path
+        for suffix in COMPRESSION_SUFFIXES.values():
+            if suffix and base_path.endswith(suffix):
+                base_path = base_path[:-len(suffix)]
+        if path == compressed_path(base_path, compression):
+            continue
+
+        size = os.path.getsize(path)
+        try:
+            with open_snapshot(path) as file:
+                data = file.read()
+        except (OSError, ValueError) as e:
+            logger.warning(f"[SNAPSHOT] Skipping unreadable snapshot {path}: {e}")
+            continue
+        written = write_snapshot(base_path, data, compression)
+        converted += 1
+        before += size
+        after += os.path.getsize(written)
+    return converted, before, after
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Convert fetch-data snapshots between plain and compressed formats")
+    parser.add_argument('source', nargs='?', default="fetch-data")
+    parser.add_argument('--compression', default='gzip', choices=sorted(COMPRESSION_SUFFIXES))
+    args = parser.parse_args(argv)
+    setup_logging()
+
+    converted, before, after = convert_tree(args.source, args.compression)
+    ratio = f" ({after / before:.0%} of the original size)" if before else ""
+    print(f"[SNAPSHOT] Converted {converted} snapshots: {before} -> {after} bytes{ratio}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,315 @@
+import hashlib
+import logging
+import re
+
+import soupsieve
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml import html as lxml_html
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+
+logger = logging.getLogger(__name__)
+
+HOURS_AGO_RE = re.compile(r'(\d+)\s+hours?\s+ago')
+DAYS_AGO_RE = re.compile(r'(\d+)\s+days?\s+ago')
+
+# Same order as the WebDriver lookups in extract_list_content
+CONTAINER_SELECTORS = [
+    ('//*[@id="stream"]', "Stream ID"),
+    ('//*[@class="stream"]', "Stream Class"),
+    ('//ul[contains(@class, "stream")]', "Stream UL"),
+    ('//div[contains(@class, "stream")]', "Stream DIV")
+]
+
+TITLE_SELECTOR = 'div.te-stream-title-div a.te-stream-title, a.te-stream-title-2'
+
+# Strings BeautifulSoup's get_text() leaves out (Script, Stylesheet and TemplateString)
+SKIPPED_TEXT_TAGS = {'script', 'style', 'template'}
+PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+ASCII_SPACES = str.maketrans('', '', '\x20\x0a\x09\x0c\x0d')
+
+
+def is_too_old(time_text, max_hour, max_day):
+    """Check a relative time string ("5 hours ago") against the age window"""
+    hours_match = HOURS_AGO_RE.search(time_text)
+    if hours_match:
+        return int(hours_match.group(1)) > max_hour
+    days_match = DAYS_AGO_RE.search(time_text)
+    if days_match:
+        return int(days_match.group(1)) >= max_day
+    return False
+
+
+def item_key(record):
+    """Stable identity of a record; relative times change between runs, so they are left out"""
+    raw = '\x1f'.join((record.get('link', ''), record.get('title', ''), record.get('content', '')))
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+def _normalize_string(text, preserve):
+    # BeautifulSoup collapses whitespace-only strings to a single newline or space
+    if not preserve and not text.translate(ASCII_SPACES):
+        return '\n' if '\n' in text else ' '
+    return text
+
+
+def iter_strings(element, preserve=False):
+    """Yield the text nodes of an element in document order, as BeautifulSoup does"""
+    preserve = preserve or element.tag in PRESERVE_WHITESPACE_TAGS
+    if element.text and element.tag not in SKIPPED_TEXT_TAGS:
+        yield _normalize_string(element.text, preserve)
+    for child in element:
+        if isinstance(child.tag, str) and child.tag not in SKIPPED_TEXT_TAGS:
+            yield from iter_strings(child, preserve)
+        if child.tail:
+            yield _normalize_string(child.tail, preserve)
+
+
+def get_text(element, separator=''):
+    return separator.join(iter_strings(element))
+
+
+def get_stripped_text(element):
+    return ''.join(text.strip() for text in iter_strings(element) if text.strip())
+
+
+def _has_ancestor_class(element, tag, class_name):
+    parent = element.getparent()
+    while parent is not None:
+        if parent.tag == tag and class_name in parent.classes:
+            return True
+        parent = parent.getparent()
+    return False
+
+
+def find_title_element(li):
+    """Equivalent of select_one(TITLE_SELECTOR)"""
+    for anchor in li.iter('a'):
+        classes = anchor.classes
+        if 'te-stream-title-2' in classes:
+            return anchor
+        if 'te-stream-title' in classes and _has_ancestor_class(anchor, 'div', 'te-stream-title-div'):
+            return anchor
+    return None
+
+
+def build_record(li):
+    """Build the output record for one li.te-stream-item, or None if it has no usable link"""
+    title_element = find_title_element(li)
+    if title_element is not None:
+        link = title_element.get('href')
+        if link is None:
+            return None
+        title = get_stripped_text(title_element)
+    else:
+        title = link = ''
+
+    time_element = next(li.iter('small'), None)
+    time_text = get_stripped_text(time_element) if time_element is not None else ''
+
+    return _make_record(title, link, time_text, get_text(li, separator=' '))
+
+
+def find_container(document, selectors=None):
+    """Return (container, selector name) using the same fallbacks as the WebDriver path (or the given (xpath, name) list)"""
+    for selector, selector_name in selectors or CONTAINER_SELECTORS:
+        matches = document.xpath(selector)
+        if matches:
+            return matches[0], selector_name
+
+    first_item = next(document.iter('li'), None)
+    if first_item is not None and first_item.getparent() is not None:
+        return first_item.getparent(), "First list item parent"
+    return None, None
+
+
+class ExtractionError(Exception):
+    """The page had no usable stream (no container, or nothing kept and no reason to expect nothing)"""
+
+
+class StreamPage:
+    """Records extracted from one page in a single parse"""
+
+    def __init__(self, title='', container_selector=None, records=None, item_count=0, cutoff_reached=False, seen_reached=False):
+        self.title = title
+        self.container_selector = container_selector
+        self.records = records or []
+        self.item_count = item_count
+        self.kept_count = len(self.records)
+        self.cutoff_reached = cutoff_reached
+        self.seen_reached = seen_reached
+
+    @property
+    def has_container(self):
+        return self.container_selector is not None
+
+
+def parse_stream(page_html, max_hour=48, max_day=2, seen_keys=None, container_selectors=None):
+    """
+    Parse a full page once: locate the container, apply the age cutoff and build records.
+    Stops at the first record whose item_key is in seen_keys (the previous run's high-water mark).
+    """
+    page = StreamPage()
+    page.records = list(iter_stream(page_html, page, max_hour=max_hour, max_day=max_day, seen_keys=seen_keys, container_selectors=container_selectors))
+    return page
+
+
+def iter_stream(page_html, page, max_hour=48, max_day=2, seen_keys=None, container_selectors=None):
+    """
+    Generator version of parse_stream: yields records one at a time and fills in
+    page's title, container, item count and stop reason as it goes.
+    """
+    document = lxml_html.fromstring(page_html)
+    page.title = (document.findtext('.//title') or '').strip()
+
+    container, page.container_selector = find_container(document, container_selectors)
+    if container is None:
+        return
+
+    for li in container.iter('li'):
+        page.item_count += 1
+
+        time_element = next(li.iter('small'), None)
+        time_text = get_stripped_text(time_element) if time_element is not None else ''
+        if time_text and is_too_old(time_text, max_hour, max_day):
+            page.cutoff_reached = True
+            break
+
+        if 'te-stream-item' not in li.classes:
+            continue
+
+        record = build_record(li)
+        if record is None:
+            continue
+        if seen_keys and item_key(record) in seen_keys:
+            page.seen_reached = True
+            break
+        page.kept_count += 1
+        yield record
+
+
+def _make_record(title, link, time_text, text):
+    content = text.split(time_text)[0].strip() if time_text else text.strip()
+    return {
+        "title": title,
+        "link": link,
+        "time": time_text,
+        "content": content
+    }
+
+
+def _parse_items_lxml(html_content):
+    document = lxml_html.document_fromstring(html_content)
+    records = []
+    for li in document.iter('li'):
+        if 'te-stream-item' in li.classes:
+            record = build_record(li)
+            if record is not None:
+                records.append(record)
+    return records
+
+
+# At parse time the class attribute is still one string, so match the token with a regex
+_ITEM_STRAINER = SoupStrainer('li', class_=re.compile(r'(^|\s)te-stream-item(\s|$)'))
+_SOUP_TITLE_SELECTOR = soupsieve.compile(TITLE_SELECTOR)
+
+
+def _parse_items_soup(html_content):
+    soup = BeautifulSoup(html_content, 'lxml', parse_only=_ITEM_STRAINER)
+    records = []
+    for li in soup.find_all('li', class_='te-stream-item'):
+        title_element = _SOUP_TITLE_SELECTOR.select_one(li)
+        if title_element is not None and not title_element.has_attr('href'):
+            continue
+        title = title_element.get_text(strip=True) if title_element else ''
+        link = title_element['href'] if title_element else ''
+
+        time_element = li.find('small')
+        time_text = time_element.get_text(strip=True) if time_element else ''
+
+        records.append(_make_record(title, link, time_text, li.get_text(separator=' ')))
+    return records
+
+
+def _iter_strings_selectolax(node, preserve=False):
+    preserve = preserve or node.tag in PRESERVE_WHITESPACE_TAGS
+    for child in node.iter(include_text=True):
+        if child.tag == '-text':
+            yield _normalize_string(child.text_content, preserve)
+        elif not child.tag.startswith('-') and child.tag not in SKIPPED_TEXT_TAGS:
+            yield from _iter_strings_selectolax(child, preserve)
+
+
+def _parse_items_selectolax(html_content):
+    tree = LexborHTMLParser(html_content)
+    records = []
+    for li in tree.css('li.te-stream-item'):
+        title_element = li.css_first(TITLE_SELECTOR)
+        if title_element is not None:
+            if 'href' not in title_element.attributes:
+                continue
+            link = title_element.attributes['href'] or ''
+            title = ''.join(text.strip() for text in _iter_strings_selectolax(title_element) if text.strip())
+        else:
+            title = link = ''
+
+        time_element = li.css_first('small')
+        time_text = ''
+        if time_element is not None:
+            time_text = ''.join(text.strip() for text in _iter_strings_selectolax(time_element) if text.strip())
+
+        records.append(_make_record(title, link, time_text, ' '.join(_iter_strings_selectolax(li))))
+    return records
+
+
+def _parse_items_html_parser(html_content):
+    # Reference implementation: the original extract_data_as_json loop
+    soup = BeautifulSoup(html_content, 'html.parser')
+    records = []
+    for li in soup.find_all('li', class_='te-stream-item'):
+        try:
+            title_element = li.select_one(TITLE_SELECTOR)
+            title = title_element.get_text(strip=True) if title_element else ''
+            link = title_element['href'] if title_element else ''
+
+            time_element = li.find('small')
+            time_text = time_element.get_text(strip=True) if time_element else ''
+
+            content = li.get_text(separator=' ').split(time_text)[0].strip() if time_text else li.get_text(separator=' ').strip()
+
+            records.append({
+                "title": title,
+                "link": link,
+                "time": time_text,
+                "content": content
+            })
+        except Exception:
+            continue
+    return records
+
+
+PARSER_BACKENDS = {
+    'html.parser': _parse_items_html_parser,
+    'lxml': _parse_items_lxml,
+    'soup': _parse_items_soup,
+    'selectolax': _parse_items_selectolax,
+}
+
+
+def get_parser_backend(name):
+    """Return the item parser for a backend name, falling back to lxml when selectolax is missing"""
+    if name not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {name} (expected one of {', '.join(PARSER_BACKENDS)})")
+    if name == 'selectolax' and LexborHTMLParser is None:
+        logger.info("[PARSE] selectolax is not installed, using lxml")
+        return PARSER_BACKENDS['lxml']
+    return PARSER_BACKENDS[name]
+
+
+def parse_items(html_content, backend='lxml'):
+    """Turn li.te-stream-item HTML into records; every backend matches the html.parser output"""
+    return get_parser_backend(backend)(html_content)
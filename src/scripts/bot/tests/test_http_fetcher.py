@@ -0,0 +1,72 @@
+import os
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_fetcher import HttpStreamFetcher
+
+
+TITLE = "Euro Area \xa0 ZEW Economic Sentiment €"
+
+PAGE = """<html><head>{meta}<title>Stream | Trading Economics</title></head><body>
+<ul id="stream">
+<li class="te-stream-item">
+<div class="te-stream-title-div"><a class="te-stream-title" href="/euro-area/zew">{title}</a></div>
+<span>Sentiment rose – above forecasts</span> <small>1 hour ago</small>
+</li>
+</ul>
+</body></html>"""
+
+
+class _PageHandler(BaseHTTPRequestHandler):
+    """Serves UTF-8 pages with a bare `Content-Type: text/html` (no charset)"""
+
+    pages = {
+        '/plain.html': PAGE.format(meta='', title=TITLE),
+        '/meta.html': PAGE.format(meta='<meta charset="utf-8">', title=TITLE),
+    }
+
+    def do_GET(self):
+        body = self.pages[self.path].encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class HttpStreamFetcherEncodingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _PageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def fetch(self, path):
+        result = HttpStreamFetcher().fetch(self.base_url + path)
+        self.assertIsNone(result.fallback_reason)
+        self.assertEqual(len(result.records), 1)
+        return result.records[0]
+
+    def test_utf8_without_charset_header(self):
+        record = self.fetch('/plain.html')
+        self.assertEqual(record['title'], TITLE)
+        self.assertIn("rose – above", record['content'])
+
+    def test_utf8_with_meta_charset(self):
+        self.assertEqual(self.fetch('/meta.html')['title'], TITLE)
+
+
+if __name__ == "__main__":
+    unittest.main()
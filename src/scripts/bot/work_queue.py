@@ -0,0 +1,290 @@
+import argparse
+import logging
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from fetch_policy import backoff_delay
+from log_setup import setup_logging
+
+
+logger = logging.getLogger(__name__)
+
+QUEUE_PATH = os.path.join("fetch-data", ".queue", "jobs.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    url TEXT PRIMARY KEY,
+    engine TEXT NOT NULL DEFAULT 'auto',
+    state TEXT NOT NULL DEFAULT 'queued',
+    available_at REAL NOT NULL,
+    interval REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_token TEXT,
+    last_status TEXT,
+    last_error TEXT,
+    enqueued_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_available ON jobs(state, available_at);
+"""
+
+# queued: waiting for available_at; leased: invisible until available_at (the lease expiry),
+# then up for grabs again; done: one-off job finished; dead: gave up after max_attempts
+STATES = ('queued', 'leased', 'done', 'dead')
+
+
+class Job:
+    """A leased fetch job; the token ties complete/fail/release calls to this lease"""
+
+    def __init__(self, url, engine, interval, attempts, lease_token):
+        self.url = url
+        self.engine = engine
+        self.interval = interval  # seconds between runs for recurring jobs, None for one-off
+        self.attempts = attempts  # leases taken since the last success, this one included
+        self.lease_token = lease_token
+
+
+class DeferJob(Exception):
+    """Raised by a job handler to put the job back for `delay` seconds without counting an attempt"""
+
+    def __init__(self, delay, reason=None):
+        super().__init__(reason or f"deferred for {delay:.0f}s")
+        self.delay = delay
+
+
+class WorkQueue:
+    """
+    Durable fetch queue in SQLite, one row per URL. A lease is a visibility timeout: the job
+    stays hidden from other workers until it expires, so the jobs of a crashed worker are
+    leased again automatically. Meant for workers on one machine (SQLite locking is not safe
+    over network filesystems).
+    """
+
+    def __init__(self, path=QUEUE_PATH, max_attempts=5, retry_delay=60, max_retry_delay=3600):
+        self.path = path
+        self.max_attempts = max_attempts  # leases without success before a one-off job is dead
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        # Autocommit mode, so lease() can take the write lock up front with BEGIN IMMEDIATE
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        self.lock = threading.Lock()  # the heartbeat thread shares the connection
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.connection
+            except Exception:
+                self.connection.execute("ROLLBACK")
+                raise
+            self.connection.execute("COMMIT")
+
+    def enqueue(self, url, engine='auto', delay=0, interval=None):
+        """Add a job, or re-queue a finished one; a job that is queued or leased is only updated"""
+        now = time.time()
+        with self.transaction() as connection:
+            connection.execute(
+                "INSERT INTO jobs (url, engine, available_at, interval, enqueued_at, updated_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET engine = excluded.engine, interval = excluded.interval, "
+                "updated_at = excluded.updated_at, "
+                "available_at = CASE WHEN state IN ('done', 'dead') THEN excluded.available_at "
+                "                    WHEN state = 'queued' THEN MIN(available_at, excluded.available_at) "
+                "                    ELSE available_at END, "
+                "attempts = CASE WHEN state IN ('done', 'dead') THEN 0 ELSE attempts END, "
+                "state = CASE WHEN state IN ('done', 'dead') THEN 'queued' ELSE state END",
+                (url, engine, now + delay, interval, now, now)
+            )
+
+    def lease(self, owner, visibility=900):
+        """Take the job that has been available longest, hidden for `visibility` seconds; None if there is none"""
+        now = time.time()
+        with self.transaction() as connection:
+            # Jobs whose lease ran out max_attempts times are what keeps crashing workers: stop handing them out
+            connection.execute(
+                "UPDATE jobs SET state = 'dead', last_error = 'lease expired too often', lease_owner = NULL, "
+                "lease_token = NULL, updated_at = ? WHERE state = 'leased' AND available_at <= ? AND attempts >= ? AND interval IS NULL",
+                (now, now, self.max_attempts)
+            )
+            row = connection.execute(
+                "SELECT url, engine, interval, attempts FROM jobs WHERE state IN ('queued', 'leased') AND available_at <= ? "
+                "ORDER BY available_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row['attempts']:
+                logger.info(f"[QUEUE] Re-leasing {row['url']} (attempt {row['attempts'] + 1})")
+            token = uuid.uuid4().hex
+            connection.execute(
+                "UPDATE jobs SET state = 'leased', available_at = ?, attempts = attempts + 1, lease_owner = ?, "
+                "lease_token = ?, updated_at = ? WHERE url = ?",
+                (now + visibility, owner, token, now, row['url'])
+            )
+        return Job(row['url'], row['engine'], row['interval'], row['attempts'] + 1, token)
+
+    def extend(self, job, visibility=900):
+        """Push the lease expiry out; False if the lease was lost (expired and taken by another worker)"""
+        return self._update_lease(job, "available_at = ?", (time.time() + visibility,), end_lease=False)
+
+    def complete(self, job, status='ok'):
+        """Finish the job; recurring jobs are queued again one interval later"""
+        now = time.time()
+        if job.interval:
+            return self._update_lease(job, "state = 'queued', available_at = ?, attempts = 0, last_status = ?, last_error = NULL",
+                                      (now + job.interval, status))
+        return self._update_lease(job, "state = 'done', last_status = ?, last_error = NULL", (status,))
+
+    def fail(self, job, error):
+        """Queue the job again after an exponential backoff, or mark a one-off job dead after max_attempts"""
+        if job.attempts >= self.max_attempts and not job.interval:
+            logger.warning(f"[QUEUE] Giving up on {job.url} after {job.attempts} attempts: {error}")
+            return self._update_lease(job, "state = 'dead', last_status = 'failed', last_error = ?", (error,))
+        delay = max(self.retry_delay, backoff_delay(job.attempts, self.retry_delay, self.max_retry_delay))
+        if job.interval:
+            delay = min(delay, job.interval)
+            if job.attempts >= self.max_attempts:
+                logger.warning(f"[QUEUE] {job.url} failed {job.attempts} times in a row: {error}")
+        return self._update_lease(job, "state = 'queued', available_at = ?, last_status = 'failed', last_error = ?",
+                                  (time.time() + delay, error))
+
+    def release(self, job, delay=0, reason=None):
+        """Hand the job back without counting the attempt (shutdown, breaker open)"""
+        return self._update_lease(job, "state = 'queued', available_at = ?, attempts = MAX(attempts - 1, 0), last_error = ?",
+                                  (time.time() + delay, reason))
+
+    def _update_lease(self, job, assignments, params, end_lease=True):
+        """Apply an update only if the job is still under this lease"""
+        if end_lease:
+            assignments += ", lease_owner = NULL, lease_token = NULL"
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                f"UPDATE jobs SET {assignments}, updated_at = ? WHERE url = ? AND state = 'leased' AND lease_token = ?",
+                (*params, time.time(), job.url, job.lease_token)
+            )
+        if cursor.rowcount == 0:
+            logger.warning(f"[QUEUE] Lease on {job.url} was lost; another worker has the job")
+            return False
+        return True
+
+    def stats(self):
+        counts = dict.fromkeys(STATES, 0)
+        with self.lock:
+            rows = self.connection.execute("SELECT state, COUNT(*) AS jobs FROM jobs GROUP BY state").fetchall()
+        counts.update({row['state']: row['jobs'] for row in rows})
+        return counts
+
+    def jobs(self):
+        with self.lock:
+            return [dict(row) for row in self.connection.execute("SELECT * FROM jobs ORDER BY available_at")]
+
+    def close(self):
+        self.connection.close()
+
+
+def default_owner():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+@contextmanager
+def heartbeat(work_queue, job, visibility):
+    """Keep extending the lease while a long fetch runs, so only a dead worker loses its job"""
+    stop = threading.Event()
+
+    def beat():
+        while not stop.wait(visibility / 3):
+            if not work_queue.extend(job, visibility):
+                return
+
+    thread = threading.Thread(target=beat, name=f"heartbeat-{job.url}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def run_worker(work_queue, handle, owner=None, visibility=900, poll=5, max_jobs=None, stop_event=None):
+    """
+    Lease jobs and pass each to handle(job) until stopped. handle returns a status string
+    ('ok'/'unchanged' complete the job, anything else fails it), or raises DeferJob to put it back.
+    """
+    owner = owner or default_owner()
+    stop_event = stop_event or threading.Event()
+    handled = 0
+    logger.info(f"[WORKER] {owner} waiting for jobs from {work_queue.path}")
+    while not stop_event.is_set() and (max_jobs is None or handled < max_jobs):
+        job = work_queue.lease(owner, visibility)
+        if job is None:
+            stop_event.wait(poll)
+            continue
+
+        logger.info(f"[WORKER] Leased {job.url} (attempt {job.attempts})")
+        try:
+            with heartbeat(work_queue, job, visibility):
+                status = handle(job)
+        except DeferJob as e:
+            work_queue.release(job, e.delay, str(e))
+        except KeyboardInterrupt:
+            work_queue.release(job, reason='worker stopped')
+            raise
+        except Exception as e:
+            logger.error(f"[ERROR] Job {job.url} failed: {e}")
+            work_queue.fail(job, str(e))
+        else:
+            if status in ('ok', 'unchanged'):
+                work_queue.complete(job, status)
+            else:
+                work_queue.fail(job, status or 'failed')
+        handled += 1
+    return handled
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="Manage the durable fetch queue (workers: fetch-html-background.py --worker)")
+    parser.add_argument('--queue', default=QUEUE_PATH, help="Path of the SQLite queue")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_parser = subparsers.add_parser('enqueue', help="Add fetch jobs")
+    enqueue_parser.add_argument('urls', nargs='+')
+    enqueue_parser.add_argument('--engine', default='auto', choices=['auto', 'http', 'selenium'])
+    enqueue_parser.add_argument('--every', type=float, help="Repeat every this many minutes (default: run once)")
+    enqueue_parser.add_argument('--delay', type=float, default=0, help="Seconds before the first run")
+
+    subparsers.add_parser('stats', help="Job counts per state")
+    subparsers.add_parser('list', help="All jobs, next due first")
+
+    args = parser.parse_args(argv)
+    setup_logging(stream=sys.stderr)
+    work_queue = WorkQueue(args.queue)
+    try:
+        if args.command == 'enqueue':
+            for url in args.urls:
+                work_queue.enqueue(url, args.engine, args.delay, args.every * 60 if args.every else None)
+            print(f"[QUEUE] Enqueued {len(args.urls)} job(s) in {args.queue}")
+        elif args.command == 'stats':
+            print(' '.join(f"{state}={count}" for state, count in work_queue.stats().items()))
+        else:
+            for job in work_queue.jobs():
+                due = datetime.fromtimestamp(job['available_at']).strftime('%Y-%m-%d %H:%M:%S')
+                print(f"{job['state']:<7} {due} attempts={job['attempts']} {job['url']} {job['last_error'] or ''}".rstrip())
+    finally:
+        work_queue.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,21 +1,48 @@
 import sys
-import json
+from collections import Counter
 from datetime import datetime
-import firebase_admin
-from firebase_admin import credentials, db
-from openai import OpenAI
+from functools import lru_cache
 import os
-import re
 from dotenv import load_dotenv
 import pathlib
-from deep_translator import GoogleTranslator
-import spacy #library for NER, which is well-suited for extracting geographical entities.
+
+# spaCy, deep_translator, openai and firebase_admin are imported on first use: analyze_news.py
+# starts once per news item and most runs never touch spaCy, so importing them here cost seconds each time
 
 # Suppress print statements or redirect them to stderr for debugging
 import sys
 import logging
 
-nlp = spacy.load("en_core_web_sm")
+# Shared helpers (logging, news index) live next to the scrapers
+BOT_DIR = str(pathlib.Path(__file__).resolve().parent.parent / "bot")
+if BOT_DIR not in sys.path:
+    sys.path.append(BOT_DIR)
+from log_setup import RunSummary, setup_logging, track
+from run_metrics import export_run
+
+logger = logging.getLogger(__name__)
+
+NER_MODEL = "en_core_web_sm"
+# Only doc.ents is read, so the components that do not feed NER are never loaded
+NON_NER_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
+
+def load_ner_pipeline(model=NER_MODEL):
+    """spaCy pipeline trimmed to named-entity recognition"""
+    import spacy  # library for NER, which is well-suited for extracting geographical entities
+
+    pipeline = spacy.load(model, exclude=NON_NER_COMPONENTS)
+    # The shared tok2vec only feeds the tagger and parser in the small English model
+    if "tok2vec" in pipeline.pipe_names and not pipeline.get_pipe("tok2vec").listening_components:
+        pipeline.remove_pipe("tok2vec")
+    return pipeline
+
+
+@lru_cache(maxsize=None)
+def get_nlp():
+    """The NER pipeline, loaded on the first call"""
+    return load_ner_pipeline()
+
 # List of all countries (you can extend this list)
 COUNTRIES = {
     "vietnam", "brazil", "usa", "united states", "china", "japan", "germany",
@@ -25,75 +52,100 @@ COUNTRIES = {
 }
 
 
-def detect_country(content):
+def rank_countries(doc):
+    """Countries among the doc's geopolitical entities (GPE), most mentioned first, ties in order of first mention"""
+    mentions = Counter(
+        ent.text.lower() for ent in doc.ents
+        if ent.label_ == "GPE" and ent.text.lower() in COUNTRIES
+    )
+    return [country for country, _ in mentions.most_common()]
+
+
+def detect_countries(contents, batch_size=64, n_process=1):
     """
-    Detect the relevant country from the content.
-    Returns the detected country or 'global' if no country is identified.
+    Ranked country list for each of contents, in input order (empty when none is named).
+    Documents go through nlp.pipe in batches; n_process > 1 forks workers, which pays off
+    for backlogs of thousands of items (on Windows, call it under `if __name__ == "__main__"`).
     """
-    # Run NER to identify geopolitical entities
-    doc = nlp(content)
-    
-    detected_countries = set()
-    
-    # Extract geopolitical entities (GPE)
-    for ent in doc.ents:
-        if ent.label_ == "GPE" and ent.text.lower() in COUNTRIES:
-            detected_countries.add(ent.text.lower())
-    
-    if detected_countries:
-        # If multiple countries are detected, return the first one (or customize as needed)
-        return list(detected_countries)[0]
-    
-    # Fallback to 'global' if no country is identified
-    return "global"
+    texts = (content or "" for content in contents)
+    with track('ner'):
+        return [rank_countries(doc) for doc in get_nlp().pipe(texts, batch_size=batch_size, n_process=n_process)]
 
-class Logger:
-    def __init__(self, filename="debug.log"):
-        self.terminal = sys.stderr
-        self.log = open(filename, "a")
 
-    def write(self, message):
-        self.terminal.write(message)
-        self.log.write(message)
-
-    def flush(self):
-        pass
+def detect_country(content):
+    """
+    Detect the relevant country from the content.
+    Returns the most mentioned country or 'global' if no country is identified.
+    """
+    countries = detect_countries([content])[0]
+    return countries[0] if countries else "global"
 
-sys.stdout = Logger()
+# stdout is reserved for the JSON result (analyze_news.py writes to sys.__stdout__); everything else goes
+# through the queued logger to stderr and a size-rotated debug.log. LOG_QUIET=1 keeps one summary per analysis.
+sys.stdout = sys.stderr
+setup_logging(
+    level=os.getenv('LOG_LEVEL', 'INFO'),
+    quiet=os.getenv('LOG_QUIET') == '1',
+    log_file="debug.log",
+    stream=sys.stderr
+)
 
 # Your existing initialization code
 load_dotenv()
 current_dir = pathlib.Path(__file__).parent.absolute()
 key_path = os.path.join(current_dir, "config", "aianalist-firebase-adminsdk-8gwkb-09a794ac72.json")
 
-# Initialize Firebase
-if not firebase_admin._apps:
-    cred = credentials.Certificate(key_path)
-    firebase_admin.initialize_app(cred, {
-        'databaseURL': os.getenv('FIREBASE_DATABASE_URL')
-    })
+def firebase_db():
+    """firebase_admin.db, initializing the Firebase app on the first call"""
+    import firebase_admin
+    from firebase_admin import credentials, db
+
+    if not firebase_admin._apps:
+        cred = credentials.Certificate(key_path)
+        firebase_admin.initialize_app(cred, {
+            'databaseURL': os.getenv('FIREBASE_DATABASE_URL')
+        })
+    return db
 
-client = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-if not os.getenv('OPENAI_API_KEY'):
-    raise ValueError("OpenAI API Key not found in .env file.")
+@lru_cache(maxsize=None)
+def get_openai_client():
+    """OpenAI client, created on the first call"""
+    if not os.getenv('OPENAI_API_KEY'):
+        raise ValueError("OpenAI API Key not found in .env file.")
+    from openai import OpenAI
+
+    return OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
 
 def translate_to_vietnamese(text):
     """Translate English text to Vietnamese"""
     try:
-        translator = GoogleTranslator(source='en', target='vi')
-        return translator.translate(text)
+        from deep_translator import GoogleTranslator
+
+        with track('translation'):
+            translator = GoogleTranslator(source='en', target='vi')
+            return translator.translate(text)
     except Exception as e:
-        print(f"Translation error: {e}")
+        logger.error(f"Translation error: {e}")
         return text
 
 def get_latest_data_from_firebase():
-    ref = db.reference('news')
+    ref = firebase_db().reference('news')
     data = ref.order_by_child('timestamp').limit_to_last(1).get()
     if data:
         for key, value in data.items():
             return key, value
     return None, None
 
+def search_scraped_news(query, domain=None, start=None, end=None, limit=10):
+    """Full-text search over locally scraped items (see bot/news_index.py); start/end are epoch seconds."""
+    from news_index import NewsIndex
+
+    index = NewsIndex()
+    try:
+        return index.search(query, domain=domain, start=start, end=end, limit=limit)
+    finally:
+        index.close()
+
 def simple_market_analysis(content):
     """Fallback analysis for Vietnam's market impact when OpenAI API fails."""
     # Define positive and negative keywords for Vietnam's market
@@ -163,7 +215,7 @@ def simple_market_analysis(content):
     for entry in keywords_actions:
         matched_keywords = [kw for kw in entry["keywords"] if kw in content_lower]
         if matched_keywords:
-            logging.info(f"Matched keywords: {matched_keywords}")
+            logger.info(f"Matched keywords: {matched_keywords}")
             analysis.append(entry["message"])
     
     vietnamese_analysis = translate_to_vietnamese(" ".join(analysis))
@@ -173,9 +225,19 @@ def simple_market_analysis(content):
     }
 
 def process_news_by_id(news_id):
+    summary = RunSummary(logger, 'ANALYZE', id=news_id)
+    with summary.activate():
+        result = _process_news(news_id, summary)
+    summary.set(status=result["status"])
+    summary.emit()
+    export_run(summary, 'analyzer', 'news')
+    return result
+
+def _process_news(news_id, summary):
     try:
-        ref = db.reference(f'news/{news_id}')
-        news_data = ref.get()
+        ref = firebase_db().reference(f'news/{news_id}')
+        with summary.phase('firebase_read'):
+            news_data = ref.get()
         
         if not news_data:
             return {
@@ -208,7 +270,8 @@ def process_news_by_id(news_id):
                     'status': 'completed'
                 }
             }
-            ref.update(update_data)
+            with summary.phase('firebase_write'):
+                ref.update(update_data)
             
             return {
                 "status": "success",
@@ -230,31 +293,33 @@ def process_news_by_id(news_id):
 def ask_chatgpt(content):
     
     """Use OpenAI API to analyze the impact on the Vietnamese market."""
+    client = get_openai_client()
     prompt = f"""
     Analyze the following news and determine its impact on Vietnam's economy or not. Provide a detailed analysis.\n\nNews: {content}
     """
     try:
         # First try OpenAI
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert economic analyst who evaluates news impact on Vietnam's economy."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500,
-            temperature=0.4
-        )
+        with track('openai'):
+            response = client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are an expert economic analyst who evaluates news impact on Vietnam's economy."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=500,
+                temperature=0.4
+            )
         english_analysis = response.choices[0].message.content.strip()
         vietnamese_analysis = translate_to_vietnamese(english_analysis)
         
-        logging.info("OpenAI API call successful.")
+        logger.info("OpenAI API call successful.")
         return {
             "english": english_analysis,
             "vietnamese": vietnamese_analysis
         }
     except Exception as e:
-        logging.error(f"OpenAI API error: {e}")
-        logging.info("Falling back to simple analysis...")
+        logger.error(f"OpenAI API error: {e}")
+        logger.info("Falling back to simple analysis...")
         # Fallback to simple analysis
         return simple_market_analysis(content)
 
@@ -280,7 +345,7 @@ def main():
             
             try:
                 # Save both analyses back to Firebase
-                ref = db.reference(f'news/{key}')
+                ref = firebase_db().reference(f'news/{key}')
                 update_data = {
                     'analysis': {
                         'en': analysis["english"],
@@ -294,7 +359,7 @@ def main():
                 print(f"\n✓ Analysis saved to Firebase successfully for item ID: {key}")
                 
                 # Verify the save
-                saved_data = db.reference(f'news/{key}/analysis').get()
+                saved_data = firebase_db().reference(f'news/{key}/analysis').get()
                 if saved_data:
                     print("\nSaved data verification:")
                     print(f"English saved: {len(saved_data.get('en', ''))} characters")
@@ -9,6 +9,7 @@ export interface NewsItem {
     title: string;
     content: string;
     time: string;
+    /** Publish time in epoch milliseconds (the scraper writes seconds; see readNewsFile) */
     timestamp?: number;
     link: string;
 }
@@ -51,8 +52,7 @@ export async function postNewsDataToFirebase(): Promise<ProcessedDataPost> {
         console.log(`Latest file found: ${latestFilePath}`);
 
         // 3. Read and parse the file data
-        const fileData = fs.readFileSync(latestFilePath, 'utf8');
-        const parsedData: NewsItem[] = JSON.parse(fileData);
+        const parsedData = readNewsFile(latestFilePath);
 
         // 4. Firebase references
         const newsRef = ref(database, 'news');
@@ -63,7 +63,7 @@ export async function postNewsDataToFirebase(): Promise<ProcessedDataPost> {
 
         // 6. Filter and post new items
         for (const newsItem of parsedData) {
-            const processedTimestamp = convertRelativeTime(newsItem.time);
+            const processedTimestamp = newsItem.timestamp ?? convertRelativeTime(newsItem.time);
 
             // Skip old items (> 48 hours)
             if (currentTime - processedTimestamp > 48 * 60 * 60 * 1000) {
@@ -136,6 +136,15 @@ export async function postNewsDataToFirebase(): Promise<ProcessedDataPost> {
 
 
 
+/**
+ * Read a scraper snapshot. The scraper writes `timestamp` in epoch seconds,
+ * so convert it to milliseconds like every other time on this side.
+ */
+function readNewsFile(filePath: string): NewsItem[] {
+    const items: NewsItem[] = JSON.parse(fs.readFileSync(filePath, 'utf8'));
+    return items.map((item) => (typeof item.timestamp === 'number' ? { ...item, timestamp: item.timestamp * 1000 } : item));
+}
+
 function convertRelativeTime(relativeTime: string): number {
     const now = new Date().getTime();
     const timeString = relativeTime.toLowerCase();
@@ -212,15 +221,14 @@ export async function previewProcessedData(): Promise<ProcessedDataPost> {
         const latestFilePath = getLatestFile();
         console.log(`Latest file found: ${latestFilePath}`);
 
-        const fileData = fs.readFileSync(latestFilePath, 'utf8');
-        const parsedData: NewsItem[] = JSON.parse(fileData);
+        const parsedData = readNewsFile(latestFilePath);
 
         // 4. Filter new valid items
         const currentTime = new Date().getTime();
         const validItems: Array<NewsItem & { processedTimestamp: number }> = [];
 
         for (const newsItem of parsedData) {
-            const processedTimestamp = convertRelativeTime(newsItem.time);
+            const processedTimestamp = newsItem.timestamp ?? convertRelativeTime(newsItem.time);
 
             // Skip old items (> 48 hours)
             if (currentTime - processedTimestamp > 48 * 60 * 60 * 1000) {